@@ -0,0 +1,216 @@
+import argparse
+import hashlib
+import json
+from collections import OrderedDict
+from pathlib import Path
+
+import tornado.ioloop
+import tornado.web
+
+from telemetry import cache_result, read_json, render_prometheus
+
+# === Read-only JSON API over the insight datasets ===
+# Serves the rq1-rq5 and language comparison tables from a shared in-memory
+# store. Responses are gzipped, revalidated with ETags derived from the
+# snapshot version and the query, and cached as serialized bytes.
+#
+#   GET /api/v1/datasets
+#   GET /api/v1/datasets/<folder>/<file>?actor_type=&country=&administration=
+#       &month_from=YYYY-MM&month_to=YYYY-MM&userName=&sort=-total_engagement&page=1&page_size=100
+
+BASE_PATH = Path("insights")
+DATASET_DIRS = [
+    "rq1", "rq1_themes_framing", "rq2", "rq2_themes_framing", "rq3", "rq3_themes_framing",
+    "rq4", "rq4_themes_framing", "rq5", "rq5_themes_framing", "language_comparison",
+]
+MONTH_COLUMNS = ["month", "created_month"]
+FILTER_PARAMS = ["actor_type", "country", "administration", "userName"]
+DEFAULT_SORT = {"rq4/narrative_shapers_leaderboard": "-total_engagement"}
+
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+RESPONSE_CACHE_SIZE = 2048
+RELOAD_INTERVAL = 30
+
+
+def snapshot_version(base_path=BASE_PATH, folders=DATASET_DIRS):
+    """Hash of the served insight files; changes whenever any of them is regenerated"""
+    digest = hashlib.sha256()
+    for folder in folders:
+        for path in sorted((Path(base_path) / folder).glob("*.json")):
+            digest.update(f"{folder}/{path.name}".encode("utf-8"))
+            digest.update(path.read_bytes())
+    return digest.hexdigest()[:16]
+
+
+class InsightStore:
+    def __init__(self, base_path=BASE_PATH):
+        self.base_path = Path(base_path)
+        self.version = None
+        self.datasets = {}
+        self._responses = OrderedDict()
+
+    def load(self):
+        version = snapshot_version(self.base_path)
+        if version == self.version:
+            return False
+        datasets = {}
+        for folder in DATASET_DIRS:
+            for path in sorted((self.base_path / folder).glob("*.json")):
+                df = read_json(path, convert_dates=False)
+                if "author.userName" in df.columns:
+                    df = df.rename(columns={"author.userName": "userName"})
+                datasets[f"{folder}/{path.stem}"] = df
+        self.datasets = datasets
+        self.version = version
+        self._responses.clear()
+        return True
+
+    def describe(self):
+        return {
+            "version": self.version,
+            "datasets": {
+                name: {"rows": len(df), "columns": list(df.columns)}
+                for name, df in self.datasets.items()
+            },
+        }
+
+    def query(self, name, filters, month_from=None, month_to=None, sort=None, page=1, page_size=DEFAULT_PAGE_SIZE):
+        df = self.datasets[name]
+
+        for col, value in filters.items():
+            if col not in df.columns:
+                continue
+            # List-valued fields (e.g. leaderboard countries) match on membership
+            if df[col].map(lambda x: isinstance(x, list)).any():
+                df = df[df[col].map(lambda x: isinstance(x, list) and value in x)]
+            else:
+                df = df[df[col] == value]
+
+        month_col = next((c for c in MONTH_COLUMNS if c in df.columns), None)
+        if month_col:
+            if month_from:
+                df = df[df[month_col].astype(str) >= month_from]
+            if month_to:
+                df = df[df[month_col].astype(str) <= month_to]
+
+        sort = sort or DEFAULT_SORT.get(name)
+        if sort and sort.lstrip("-") in df.columns:
+            df = df.sort_values(sort.lstrip("-"), ascending=not sort.startswith("-"), kind="stable")
+
+        total = len(df)
+        start = (page - 1) * page_size
+        page_df = df.iloc[start:start + page_size]
+        return {
+            "dataset": name,
+            "version": self.version,
+            "total": total,
+            "page": page,
+            "page_size": page_size,
+            "data": json.loads(page_df.to_json(orient="records", force_ascii=False)),
+        }
+
+    def cached_response(self, key, build):
+        """Return serialized bytes for `key`, building them with `build()` on a miss"""
+        body = self._responses.get(key)
+        cache_result("api_response", body is not None)
+        if body is not None:
+            self._responses.move_to_end(key)
+            return body
+        body = json.dumps(build(), ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+        self._responses[key] = body
+        if len(self._responses) > RESPONSE_CACHE_SIZE:
+            self._responses.popitem(last=False)
+        return body
+
+
+class BaseHandler(tornado.web.RequestHandler):
+    def initialize(self, store):
+        self.store = store
+
+    def compute_etag(self):
+        # ETags are set explicitly from the snapshot version and query
+        return None
+
+    def write_json(self, key, build):
+        etag = '"' + hashlib.sha1(f"{self.store.version}|{key}".encode("utf-8")).hexdigest() + '"'
+        self.set_header("Etag", etag)
+        self.set_header("Cache-Control", "no-cache")
+        if self.check_etag_header():
+            self.set_status(304)
+            return
+        self.set_header("Content-Type", "application/json; charset=UTF-8")
+        self.write(self.store.cached_response(key, build))
+
+    def write_error(self, status_code, **kwargs):
+        self.set_header("Content-Type", "application/json; charset=UTF-8")
+        self.finish(json.dumps({"error": self._reason, "status": status_code}))
+
+
+class DatasetListHandler(BaseHandler):
+    def get(self):
+        self.write_json("datasets", self.store.describe)
+
+
+class DatasetHandler(BaseHandler):
+    def get(self, name):
+        if name not in self.store.datasets:
+            raise tornado.web.HTTPError(404, reason=f"Unknown dataset: {name}")
+
+        try:
+            page = int(self.get_argument("page", "1"))
+            page_size = int(self.get_argument("page_size", str(DEFAULT_PAGE_SIZE)))
+        except ValueError:
+            raise tornado.web.HTTPError(400, reason="page and page_size must be integers")
+        if page < 1 or not 1 <= page_size <= MAX_PAGE_SIZE:
+            raise tornado.web.HTTPError(400, reason=f"page must be >= 1 and page_size in 1..{MAX_PAGE_SIZE}")
+
+        filters = {p: self.get_argument(p) for p in FILTER_PARAMS if self.get_argument(p, None)}
+        month_from = self.get_argument("month_from", None)
+        month_to = self.get_argument("month_to", None)
+        sort = self.get_argument("sort", None)
+
+        key = json.dumps([name, sorted(filters.items()), month_from, month_to, sort, page, page_size])
+        self.write_json(key, lambda: self.store.query(name, filters, month_from, month_to, sort, page, page_size))
+
+
+class MetricsHandler(tornado.web.RequestHandler):
+    def get(self):
+        self.set_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.write(render_prometheus())
+
+
+def make_app(store):
+    return tornado.web.Application(
+        [
+            (r"/api/v1/datasets", DatasetListHandler, {"store": store}),
+            (r"/api/v1/datasets/([\w-]+/[\w-]+)", DatasetHandler, {"store": store}),
+            (r"/metrics", MetricsHandler),
+        ],
+        compress_response=True,
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve the insight datasets as a read-only JSON API.")
+    parser.add_argument("--port", type=int, default=8502)
+    parser.add_argument("--address", default="127.0.0.1")
+    parser.add_argument("--insights", default=str(BASE_PATH), help="Insights directory")
+    parser.add_argument("--reload-interval", type=int, default=RELOAD_INTERVAL,
+                        help="Seconds between checks for regenerated insight files (0 disables)")
+    args = parser.parse_args()
+
+    store = InsightStore(args.insights)
+    store.load()
+    app = make_app(store)
+    app.listen(args.port, address=args.address)
+
+    if args.reload_interval > 0:
+        tornado.ioloop.PeriodicCallback(store.load, args.reload_interval * 1000).start()
+
+    print(f"Serving {len(store.datasets)} datasets (version {store.version}) on http://{args.address}:{args.port}/api/v1/datasets")
+    tornado.ioloop.IOLoop.current().start()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,7 @@
 # streamlit_app.py
 
 import streamlit as st
+from streamlit.runtime.scriptrunner import get_script_run_ctx
 import json
 import pandas as pd
 from pathlib import Path
@@ -11,10 +12,15 @@ from rq2 import show_rq2
 from rq3 import show_rq3
 from rq4 import show_rq4
 from rq5 import show_rq5
+from sql_query import show_sql_query
+from telemetry import start_metrics_server, tab_run, touch_session
 
 
 st.set_page_config(page_title="Ukraine Narrative Dashboard", layout="wide")
 
+# Prometheus metrics on a local port; started once per server process
+start_metrics_server()
+
 # === Load Insight Files ===
 INSIGHTS_DIR = Path("output/insights")
 
@@ -60,6 +66,9 @@ def show_intro():
 - **US_Admin** – U.S. officials from Trump/Biden administrations
     """)
 
+# Short tab names used as metric labels, in the same order as the sidebar tabs
+TAB_IDS = ["intro", "rq1", "rq2", "rq3", "rq4", "rq5", "language_comparison", "sql_query"]
+
 # === Main App ===
 def main():
     tab_names = [
@@ -70,24 +79,32 @@ def main():
         "🧑‍🤝‍🧑 RQ4: Main Narrative Shapers and Per-Author View",
         "🌍 RQ5: Contextual Variations and Country/Admin Comparison",
         "🧪 Native vs Non-native Language Comparison",
+        "🧮 Ad-hoc SQL Query",
     ]
     selected_tab = st.sidebar.radio("📂 Select Insight Tab", tab_names)
 
-    if selected_tab == tab_names[0]:
-        show_intro()
-    elif selected_tab == tab_names[1]:
-        show_rq1()
-    elif selected_tab == tab_names[2]:
-        show_rq2()
-    elif selected_tab == tab_names[3]:
-        show_rq3()
-    elif selected_tab == tab_names[4]:
-        show_rq4()
-    elif selected_tab == tab_names[5]:
-        show_rq5()
-    elif selected_tab == tab_names[6]:
-        show_language_comparison()
-    # Other tabs will go here one-by-one
+    ctx = get_script_run_ctx()
+    if ctx is not None:
+        touch_session(ctx.session_id)
+
+    with tab_run(TAB_IDS[tab_names.index(selected_tab)]):
+        if selected_tab == tab_names[0]:
+            show_intro()
+        elif selected_tab == tab_names[1]:
+            show_rq1()
+        elif selected_tab == tab_names[2]:
+            show_rq2()
+        elif selected_tab == tab_names[3]:
+            show_rq3()
+        elif selected_tab == tab_names[4]:
+            show_rq4()
+        elif selected_tab == tab_names[5]:
+            show_rq5()
+        elif selected_tab == tab_names[6]:
+            show_language_comparison()
+        elif selected_tab == tab_names[7]:
+            show_sql_query()
+        # Other tabs will go here one-by-one
 
 if __name__ == "__main__":
     main()
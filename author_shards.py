@@ -0,0 +1,207 @@
+import argparse
+import hashlib
+import json
+import os
+from functools import lru_cache
+from pathlib import Path
+
+import pandas as pd
+
+from snapshots import cached_content
+from telemetry import inc, span
+
+# === Per-author sharded storage for RQ4 drill-downs ===
+# Author-level tables are split into a fixed number of shard files keyed by a
+# hash of the username. The index only records the shard count, so the shard of
+# any author is computed directly and a drill-down reads just the selected
+# authors' shards, independent of how many authors exist. The index also holds
+# digests of the source tables, so shards left behind by an in-place
+# regeneration of those tables are detected and not used.
+
+BASE_PATH = Path("insights")
+SHARD_DIR = BASE_PATH / "rq4_authors"
+INDEX_FILE = "index.json"
+NUM_SHARDS = 64
+
+SOURCE_TABLES = {
+    "theme": "rq4_themes_framing/theme_distribution_by_author.json",
+    "framing": "rq4_themes_framing/framing_distribution_by_author.json",
+}
+
+ENGAGEMENT_COLS = ["total_engagement", "likeCount", "retweetCount", "replyCount", "quoteCount"]
+
+
+def shard_name(user_name, num_shards=NUM_SHARDS):
+    digest = hashlib.md5(user_name.encode("utf-8")).hexdigest()
+    return f"shard_{int(digest[:8], 16) % num_shards:02d}.json"
+
+
+@lru_cache(maxsize=256)
+def _file_digest_cached(path, size, mtime_ns):
+    with open(path, "rb") as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+def file_digest(path):
+    """sha256 of a file's content, recomputed only when its size or mtime changes"""
+    stat = Path(path).stat()
+    return _file_digest_cached(str(path), stat.st_size, stat.st_mtime_ns)
+
+
+def _load_author_table(path):
+    df = pd.read_json(path)
+    if "author.userName" in df.columns:
+        df = df.rename(columns={"author.userName": "userName"})
+    return df
+
+
+def explode_codes(df, col):
+    """Split comma separated code strings (e.g. "T-1, T-3") into one row per code"""
+    df = df.dropna(subset=[col]).copy()
+    df[col] = df[col].apply(
+        lambda x: x if isinstance(x, list) else [c.strip() for c in str(x).split(",") if c.strip()]
+    )
+    return df.explode(col).dropna(subset=[col])
+
+
+def build_author_timelines(df_tweets):
+    """Aggregate coded tweets into per-author monthly narrative/theme/framing/engagement rows"""
+    df = df_tweets.rename(columns={"author.userName": "userName"}).copy()
+    if "created_month" not in df.columns:
+        df["created_month"] = pd.to_datetime(df["createdAt"]).dt.strftime("%Y-%m")
+    eng_cols = [c for c in ENGAGEMENT_COLS if c in df.columns]
+    if "total_engagement" not in df.columns:
+        df["total_engagement"] = df[eng_cols].sum(axis=1)
+        eng_cols = ["total_engagement"] + eng_cols
+
+    keys = ["userName", "created_month"]
+    parts = [
+        df.groupby(keys + ["narrative"]).size().rename("count").reset_index()
+        .rename(columns={"narrative": "code"}).assign(kind="narrative"),
+    ]
+    for kind in ["themes", "framing"]:
+        if kind in df.columns:
+            exploded = explode_codes(df, kind)
+            parts.append(
+                exploded.groupby(keys + [kind]).size().rename("count").reset_index()
+                .rename(columns={kind: "code"}).assign(kind=kind)
+            )
+    df_codes = pd.concat(parts, ignore_index=True)
+
+    df_eng = df.groupby(keys)[eng_cols].sum().reset_index()
+    return df_codes.merge(df_eng, on=keys, how="left")
+
+
+def build_author_shards(base_path=BASE_PATH, shard_dir=None, timelines=None, num_shards=NUM_SHARDS):
+    base_path = Path(base_path)
+    shard_dir = Path(shard_dir) if shard_dir else base_path / "rq4_authors"
+
+    sources = {table: file_digest(base_path / table) for table in SOURCE_TABLES.values()}
+    df_theme = _load_author_table(base_path / SOURCE_TABLES["theme"])
+    df_framing = _load_author_table(base_path / SOURCE_TABLES["framing"])
+
+    authors = {}
+
+    def add_rows(df, key):
+        for row in df.to_dict(orient="records"):
+            user = row.pop("userName")
+            authors.setdefault(user, {})[key] = row
+
+    add_rows(df_theme, "theme")
+    add_rows(df_framing, "framing")
+    if timelines is not None:
+        for user, group in timelines.groupby("userName"):
+            authors.setdefault(user, {})["timeline"] = group.drop(columns="userName").to_dict(orient="records")
+
+    shards = {}
+    for user in sorted(authors):
+        shards.setdefault(shard_name(user, num_shards), {})[user] = authors[user]
+
+    shard_dir.mkdir(parents=True, exist_ok=True)
+    for old in shard_dir.glob("shard_*.json"):
+        if old.name not in shards:
+            old.unlink()
+    for name, content in shards.items():
+        with open(shard_dir / name, "w", encoding="utf-8") as f:
+            json.dump(content, f, ensure_ascii=False)
+    with open(shard_dir / INDEX_FILE, "w", encoding="utf-8") as f:
+        json.dump({"num_shards": num_shards, "sources": sources}, f, indent=1)
+
+    return shards
+
+
+def load_shard_index(shard_dir=SHARD_DIR):
+    """Shard count and source digests recorded by build_author_shards, or None when no shards have been built"""
+    path = Path(shard_dir) / INDEX_FILE
+    if not path.exists():
+        return None
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def shards_current(base_path, index):
+    """Whether the source tables still match the digests the shards were built from"""
+    sources = index.get("sources")
+    if not sources:
+        return False
+    try:
+        return all(file_digest(Path(base_path) / table) == digest for table, digest in sources.items())
+    except OSError:
+        return False
+
+
+def load_authors(user_names, shard_dir=SHARD_DIR, num_shards=None):
+    """Read only the shards holding the given authors and return their records"""
+    shard_dir = Path(shard_dir)
+    num_shards = num_shards or (load_shard_index(shard_dir) or {}).get("num_shards", NUM_SHARDS)
+
+    by_shard = {}
+    for user in user_names:
+        by_shard.setdefault(shard_name(user, num_shards), []).append(user)
+
+    records = {}
+    for name, users in by_shard.items():
+        path = shard_dir / name
+        if not path.exists():
+            continue
+        with span("load", f"{shard_dir.name}/{name}"):
+            shard = cached_content(path)
+            if shard is None:
+                with open(path, "r", encoding="utf-8") as f:
+                    shard = json.load(f)
+                inc("dashboard_bytes_loaded_total", path.stat().st_size, dataset=shard_dir.name)
+        for user in users:
+            if user in shard:
+                records[user] = shard[user]
+    return records
+
+
+def author_frame(records, key):
+    """Turn the `theme`/`framing` part of author records into a wide DataFrame keyed by userName"""
+    rows = [{"userName": user, **rec[key]} for user, rec in records.items() if key in rec]
+    return pd.DataFrame(rows)
+
+
+def author_timeline_frame(records):
+    rows = [
+        {"userName": user, **row}
+        for user, rec in records.items()
+        for row in rec.get("timeline", [])
+    ]
+    return pd.DataFrame(rows)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build per-author shards for the RQ4 drill-down.")
+    parser.add_argument("--insights", default=str(BASE_PATH), help="Insights directory")
+    parser.add_argument("--tweets", help="Optional coded tweets JSON used to build per-author monthly timelines")
+    parser.add_argument("--num-shards", type=int, default=NUM_SHARDS)
+    args = parser.parse_args()
+
+    timelines = None
+    if args.tweets:
+        timelines = build_author_timelines(pd.read_json(args.tweets))
+
+    shards = build_author_shards(args.insights, timelines=timelines, num_shards=args.num_shards)
+    print(f"Wrote {sum(len(s) for s in shards.values())} authors into {len(shards)} shards under "
+          f"{os.path.join(args.insights, 'rq4_authors')}")
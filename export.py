@@ -0,0 +1,261 @@
+import argparse
+import ast
+import hashlib
+import json
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
+# === Headless batch export of dashboard figures and tables ===
+# Reuses the build_* functions of the dashboard modules to render every figure
+# and table for each filter combination, without a running Streamlit server.
+# A manifest in the output directory records the input snapshot of every job,
+# so reruns only rebuild jobs whose insight files (or module code) changed.
+
+REPO_DIR = Path(__file__).resolve().parent
+MANIFEST_FILE = "manifest.json"
+
+FIGURE_FORMATS = ["html", "png", "svg"]
+TABLE_FORMATS = ["csv", "parquet"]
+
+ACTOR_TYPES = ["All", "MEP", "US_Admin"]
+METRICS = ["Count", "Percent"]
+RQ4_TOP_AUTHORS = 10
+
+# section -> (module file, insight folders it reads); local modules it imports are added automatically
+SECTION_INPUTS = {
+    "rq1": ("rq1.py", ["rq1", "rq1_themes_framing", "rq4"]),
+    "rq2": ("rq2.py", ["rq2", "rq2_themes_framing", "time_pyramid"]),
+    "rq3": ("rq3.py", ["rq3", "rq3_themes_framing", "time_pyramid"]),
+    "rq4": ("rq4.py", ["rq4", "rq4_themes_framing", "rq4_authors"]),
+    "rq5": ("rq5.py", ["rq5", "rq5_themes_framing"]),
+    "language_comparison": ("language_comparison.py", ["language_comparison"]),
+}
+
+
+def slug(value):
+    return re.sub(r"[^A-Za-z0-9_-]+", "_", str(value)).strip("_")
+
+
+def local_imports(module_file):
+    """The module file and every repo-local module it imports at module level, directly or transitively"""
+    seen = set()
+    pending = [REPO_DIR / module_file]
+    while pending:
+        path = pending.pop()
+        if path in seen:
+            continue
+        seen.add(path)
+        for node in ast.parse(path.read_text(encoding="utf-8")).body:
+            if isinstance(node, ast.Import):
+                names = [alias.name for alias in node.names]
+            elif isinstance(node, ast.ImportFrom) and node.module and not node.level:
+                names = [node.module]
+            else:
+                continue
+            for name in names:
+                candidate = REPO_DIR / f"{name.split('.')[0]}.py"
+                if candidate.exists():
+                    pending.append(candidate)
+    return sorted(seen)
+
+
+def section_snapshot(section):
+    """Hash of the insight files, module sources and export script a section depends on"""
+    module_file, folders = SECTION_INPUTS[section]
+    digest = hashlib.sha256()
+    # export.py itself assembles the jobs (filters, top authors, output formats)
+    paths = [REPO_DIR / "export.py"] + local_imports(module_file) + sorted(
+        p for folder in folders for p in (REPO_DIR / "insights" / folder).rglob("*.json")
+    )
+    for path in paths:
+        digest.update(str(path.relative_to(REPO_DIR)).encode("utf-8"))
+        digest.update(path.read_bytes())
+    return digest.hexdigest()
+
+
+def enumerate_jobs():
+    from rq3 import ENGAGEMENT_METRICS
+    from rq4 import load_leaderboard
+    from language_comparison import load_language_tables
+
+    jobs = []
+    for actor_type in ACTOR_TYPES:
+        for metric in METRICS:
+            params = {"actor_type": actor_type, "metric": metric}
+            jobs.append(("rq1", f"actor_type={actor_type}_metric={metric}", params))
+            params = {"actor_filter": actor_type, "metric": metric}
+            jobs.append(("rq2", f"actor_type={actor_type}_metric={metric}", params))
+    for engagement_metric in ENGAGEMENT_METRICS:
+        jobs.append(("rq3", f"engagement_metric={engagement_metric}", {"engagement_metric": engagement_metric}))
+
+    df_leaderboard = load_leaderboard(Path("insights"))
+    filters = {
+        "actor_type": sorted(df_leaderboard["actor_type"].unique()),
+        "country": sorted({c for sublist in df_leaderboard["country"] for c in sublist}),
+        "admin": sorted({a for sublist in df_leaderboard["administration"] for a in sublist}),
+    }
+    jobs.append(("rq4", "all", {}))
+    for key, values in filters.items():
+        for value in values:
+            jobs.append(("rq4", f"{key}={slug(value)}", {key: value}))
+
+    jobs.append(("rq5", "all", {}))
+
+    _, comp_df = load_language_tables()
+    jobs.append(("language_comparison", "all", {}))
+    for user in comp_df["userName"].unique():
+        jobs.append(("language_comparison", f"user={slug(user)}", {"selected_user": user}))
+    return jobs
+
+
+def build_job(section, params):
+    if section == "rq1":
+        from rq1 import build_rq1_figures
+        return build_rq1_figures(**params)
+    if section == "rq2":
+        from rq2 import build_rq2_figures
+        return build_rq2_figures(**params)
+    if section == "rq3":
+        from rq3 import build_rq3_figures
+        return build_rq3_figures(**params)
+    if section == "rq4":
+        from rq4 import LEADERBOARD_DISPLAY_COLS, load_leaderboard, filter_leaderboard, build_rq4_author_figures
+        base_path = Path("insights")
+        df_filtered = filter_leaderboard(load_leaderboard(base_path), **params)
+        top_authors = df_filtered["userName"].head(RQ4_TOP_AUTHORS).tolist()
+        figures, tables = build_rq4_author_figures(base_path, df_filtered, top_authors) if top_authors else ({}, {})
+        tables["leaderboard"] = df_filtered[LEADERBOARD_DISPLAY_COLS]
+        return figures, tables
+    if section == "rq5":
+        from rq5 import build_rq5_figures
+        return build_rq5_figures()
+    if section == "language_comparison":
+        from language_comparison import load_language_tables, build_language_comparison_figure
+        shift_df, comp_df = load_language_tables()
+        if "selected_user" not in params:
+            return {}, {"significant_shifts": shift_df}
+        fig, df = build_language_comparison_figure(comp_df, params["selected_user"])
+        return {"narrative_by_language": fig}, {"narrative_by_language": df}
+    raise ValueError(f"Unknown section: {section}")
+
+
+def run_job(section, name, params, out_dir, figure_formats, table_formats):
+    """Build one job and write its figures and tables. Runs in a worker process."""
+    figures, tables = build_job(section, params)
+    job_dir = Path(out_dir) / section / name
+    job_dir.mkdir(parents=True, exist_ok=True)
+
+    outputs = []
+    for fig_name, fig in figures.items():
+        for fmt in figure_formats:
+            path = job_dir / f"{fig_name}.{fmt}"
+            if fmt == "html":
+                fig.write_html(path, include_plotlyjs="cdn")
+            else:
+                fig.write_image(path, format=fmt)
+            outputs.append(str(path))
+    for table_name, df in tables.items():
+        for fmt in table_formats:
+            path = job_dir / f"{table_name}.{fmt}"
+            if fmt == "csv":
+                df.to_csv(path, index=False)
+            else:
+                df.to_parquet(path, index=False)
+            outputs.append(str(path))
+    return outputs
+
+
+def load_manifest(out_dir):
+    path = Path(out_dir) / MANIFEST_FILE
+    if not path.exists():
+        return {}
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def save_manifest(out_dir, manifest):
+    with open(Path(out_dir) / MANIFEST_FILE, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=1, sort_keys=True)
+
+
+def is_up_to_date(entry, fingerprint):
+    return (
+        entry is not None
+        and entry["fingerprint"] == fingerprint
+        and all(os.path.exists(p) for p in entry["outputs"])
+    )
+
+
+def export_all(out_dir, figure_formats=("html",), table_formats=("csv",), sections=None, workers=None, force=False):
+    out_dir = Path(out_dir).resolve()
+    out_dir.mkdir(parents=True, exist_ok=True)
+    manifest = load_manifest(out_dir)
+
+    snapshots = {section: section_snapshot(section) for section in SECTION_INPUTS}
+    formats_key = ",".join(sorted(figure_formats) + sorted(table_formats))
+
+    pending = []
+    skipped = 0
+    for section, name, params in enumerate_jobs():
+        if sections and section not in sections:
+            continue
+        job_id = f"{section}/{name}"
+        fingerprint = f"{snapshots[section]}:{formats_key}"
+        if not force and is_up_to_date(manifest.get(job_id), fingerprint):
+            skipped += 1
+            continue
+        pending.append((job_id, fingerprint, section, name, params))
+
+    failed = []
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = {
+            pool.submit(run_job, section, name, params, out_dir, list(figure_formats), list(table_formats)):
+                (job_id, fingerprint)
+            for job_id, fingerprint, section, name, params in pending
+        }
+        for future in as_completed(futures):
+            job_id, fingerprint = futures[future]
+            try:
+                manifest[job_id] = {"fingerprint": fingerprint, "outputs": future.result()}
+            except Exception as e:
+                manifest.pop(job_id, None)
+                failed.append((job_id, e))
+
+    save_manifest(out_dir, manifest)
+    return len(pending) - len(failed), skipped, failed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export all dashboard figures and tables without Streamlit.")
+    parser.add_argument("--out", default="exports", help="Output directory")
+    parser.add_argument("--figure-formats", nargs="*", default=["html"], choices=FIGURE_FORMATS)
+    parser.add_argument("--table-formats", nargs="*", default=["csv"], choices=TABLE_FORMATS)
+    parser.add_argument("--sections", nargs="*", choices=list(SECTION_INPUTS), help="Only export these sections")
+    parser.add_argument("--workers", type=int, default=None, help="Number of worker processes")
+    parser.add_argument("--force", action="store_true", help="Rebuild outputs even if their inputs are unchanged")
+    args = parser.parse_args()
+
+    if {"png", "svg"} & set(args.figure_formats):
+        try:
+            import kaleido  # noqa: F401
+        except ImportError:
+            parser.error("PNG/SVG export requires the 'kaleido' package")
+
+    out_dir = Path(args.out).resolve()
+    # The dashboard modules read insights/ relative to the repository root
+    os.chdir(REPO_DIR)
+
+    built, skipped, failed = export_all(
+        out_dir, args.figure_formats, args.table_formats, args.sections, args.workers, args.force
+    )
+    print(f"Built {built} jobs, skipped {skipped} unchanged jobs, {len(failed)} failed -> {out_dir}")
+    for job_id, error in failed:
+        print(f"  {job_id}: {error}")
+    if failed:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
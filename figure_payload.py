@@ -0,0 +1,137 @@
+import re
+from collections import defaultdict
+
+import numpy as np
+import pandas as pd
+import plotly.io as pio
+import streamlit as st
+
+from telemetry import inc, span, trace_sampled
+
+# === Compact Plotly payloads for the dashboard ===
+# Every chart goes through plotly_chart(), which shrinks the figure before it is
+# sent to the browser:
+# - numeric and date arrays are turned into numpy arrays, which plotly encodes
+#   as base64 typed arrays instead of JSON lists
+# - the layout template is reduced to the shared parts the figure actually uses
+#   (colorway, axis/legend styling, defaults for its own trace types)
+# Unchanged figures serialize to identical bytes, so with the message cache
+# settings in .streamlit/config.toml the browser reuses them across reruns.
+
+DATA_ARRAY_KEYS = ["x", "y", "z", "customdata", "text", "base", "width"]
+DATE_PATTERN = re.compile(r"^\d{4}-\d{2}(-\d{2})?$")
+COLORSCALE_LAYOUT_KEYS = ["coloraxis", "colorscale"]
+
+# figure name -> [original bytes, compact bytes, sends]; byte totals only cover sampled sends
+_payload_stats = defaultdict(lambda: [0, 0, 0])
+
+
+def _typed_array(values):
+    """Return a numpy array for numeric or ISO date values, or None if the values should stay as they are"""
+    if values is None or isinstance(values, (str, dict)) or len(values) == 0:
+        return None
+    arr = np.asarray(values)
+    if arr.dtype.kind in "iuf":
+        return arr
+    if arr.dtype.kind in "OU" and all(isinstance(v, str) and DATE_PATTERN.match(v) for v in arr):
+        # Milliseconds since epoch, which plotly.js reads as dates on a date axis
+        return arr.astype("datetime64[ms]").astype("int64").astype("float64")
+    return None
+
+
+def _compact_template(fig):
+    template = fig.layout.template.to_plotly_json() if fig.layout.template else {}
+    if not template:
+        return
+    used_types = {trace.type for trace in fig.data}
+    uses_colorscale = any(
+        getattr(getattr(trace, "marker", None), "coloraxis", None) or getattr(trace, "coloraxis", None)
+        for trace in fig.data
+    )
+    layout = dict(template.get("layout", {}))
+    if not uses_colorscale:
+        for key in COLORSCALE_LAYOUT_KEYS:
+            layout.pop(key, None)
+    data = {t: v for t, v in template.get("data", {}).items() if t in used_types}
+    fig.layout.template = {"layout": layout, "data": data}
+
+
+def compact_figure(fig):
+    """Shrink a plotly figure in place and return it"""
+    date_axes = set()
+    for trace in fig.data:
+        for key in DATA_ARRAY_KEYS:
+            if key not in trace:
+                continue
+            values = trace[key]
+            arr = _typed_array(values)
+            if arr is None:
+                continue
+            is_date = arr.dtype.kind == "f" and np.asarray(values).dtype.kind in "OU"
+            if is_date and key not in ("x", "y"):
+                continue
+            trace[key] = arr
+            if is_date:
+                date_axes.add((key, trace[f"{key}axis"] or key))
+
+    for key, axis_ref in date_axes:
+        axis_name = f"{key}axis{axis_ref[1:]}"
+        fig.layout[axis_name].type = "date"
+
+    _compact_template(fig)
+    return fig
+
+
+def payload_size(fig):
+    return len(pio.to_json(fig, validate=False).encode("utf-8"))
+
+
+def plotly_chart(fig, name, **kwargs):
+    """Drop-in replacement for st.plotly_chart that sends a compact payload; sizes are recorded for sampled runs"""
+    with span("send", name):
+        stats = _payload_stats[name]
+        stats[2] += 1
+        # Measuring sizes costs extra serializations on top of Streamlit's own, so only sampled runs pay for it
+        if not trace_sampled():
+            compact_figure(fig)
+            return st.plotly_chart(fig, **kwargs)
+        stats[0] += payload_size(fig)
+        compact_figure(fig)
+        compact = payload_size(fig)
+        stats[1] += compact
+        inc("dashboard_payload_bytes_total", compact, figure=name)
+        return st.plotly_chart(fig, **kwargs)
+
+
+def payload_stats():
+    """Per-figure send counts, and original vs compact payload bytes of the sampled sends in this process"""
+    return pd.DataFrame(
+        [
+            {"figure": name, "sends": sends, "original_bytes": original, "compact_bytes": compact,
+             "reduction_pct": round(100 * (1 - compact / original), 1) if original else 0.0}
+            for name, (original, compact, sends) in _payload_stats.items()
+        ]
+    )
+
+
+if __name__ == "__main__":
+    # Measure the payload of every figure the dashboard builds with its default filters
+    from rq1 import build_rq1_figures
+    from rq2 import build_rq2_figures
+    from rq3 import build_rq3_figures
+    from rq5 import build_rq5_figures
+
+    rows = []
+    for builder in [build_rq1_figures, build_rq2_figures, build_rq3_figures, build_rq5_figures]:
+        figures, _ = builder()
+        for fig_name, fig in figures.items():
+            original = payload_size(fig)
+            compact = payload_size(compact_figure(fig))
+            rows.append({"figure": f"{builder.__name__}:{fig_name}", "original_bytes": original,
+                         "compact_bytes": compact})
+    df = pd.DataFrame(rows)
+    df["reduction_pct"] = (100 * (1 - df["compact_bytes"] / df["original_bytes"])).round(1)
+    print(df.to_string(index=False))
+    total_original, total_compact = df["original_bytes"].sum(), df["compact_bytes"].sum()
+    print(f"\nTotal: {total_original} -> {total_compact} bytes "
+          f"({100 * (1 - total_compact / total_original):.1f}% smaller)")
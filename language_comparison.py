@@ -3,34 +3,18 @@ import pandas as pd
 import plotly.express as px
 import os
 
-INSIGHT_DIR = "insights/language_comparison"
-
-def show_language_comparison():
-    st.header("Language Comparison of MEP Narratives")
+from figure_payload import plotly_chart
+from telemetry import read_json, span
 
-    st.markdown("""
-    This section explores whether Members of the European Parliament (MEPs) present different narratives
-    in English versus their native language. It includes:
-    
-    - A **filtered view** of MEPs with large shifts in narrative between languages
-    - A **selectable comparison** for any individual MEP
-    """)
-
-    # === 1. Significant Shifts Table ===
-    st.markdown("### 🔍 MEPs with Significant Narrative Shift Between English and Native Language")
-    st.markdown("These MEPs show at least a 20% difference in narrative distribution between languages.")
-
-    shift_df = pd.read_json(os.path.join(INSIGHT_DIR, "narrative_language_shift_mep.json"))
-    st.dataframe(shift_df, use_container_width=True)
-
-    # === 2. Individual Narrative Comparison ===
-    st.markdown("### 📊 Narrative Distribution in English vs Native Language (Per MEP)")
-    st.markdown("Select an MEP to compare how their narrative stance changes between English and native-language tweets.")
+INSIGHT_DIR = "insights/language_comparison"
 
-    comp_df = pd.read_json(os.path.join(INSIGHT_DIR, "narrative_language_comparison_mep.json"))
-    available_users = comp_df["userName"].unique()
-    selected_user = st.selectbox("Select an MEP (by handle)", available_users)
+def load_language_tables():
+    shift_df = read_json(os.path.join(INSIGHT_DIR, "narrative_language_shift_mep.json"))
+    comp_df = read_json(os.path.join(INSIGHT_DIR, "narrative_language_comparison_mep.json"))
+    return shift_df, comp_df
 
+def build_language_comparison_figure(comp_df, selected_user):
+    """Build the English vs native narrative comparison for one MEP and the table behind it"""
     user_row = comp_df[comp_df["userName"] == selected_user].iloc[0]
 
     # Extract narrative percentages from each language
@@ -55,4 +39,34 @@ def show_language_comparison():
         },
         title=f"Narrative Distribution for @{selected_user}"
     )
-    st.plotly_chart(fig, use_container_width=True)
+    return fig, melted_df
+
+def show_language_comparison():
+    st.header("Language Comparison of MEP Narratives")
+
+    st.markdown("""
+    This section explores whether Members of the European Parliament (MEPs) present different narratives
+    in English versus their native language. It includes:
+    
+    - A **filtered view** of MEPs with large shifts in narrative between languages
+    - A **selectable comparison** for any individual MEP
+    """)
+
+    shift_df, comp_df = load_language_tables()
+
+    # === 1. Significant Shifts Table ===
+    st.markdown("### 🔍 MEPs with Significant Narrative Shift Between English and Native Language")
+    st.markdown("These MEPs show at least a 20% difference in narrative distribution between languages.")
+
+    st.dataframe(shift_df, use_container_width=True)
+
+    # === 2. Individual Narrative Comparison ===
+    st.markdown("### 📊 Narrative Distribution in English vs Native Language (Per MEP)")
+    st.markdown("Select an MEP to compare how their narrative stance changes between English and native-language tweets.")
+
+    available_users = comp_df["userName"].unique()
+    selected_user = st.selectbox("Select an MEP (by handle)", available_users)
+
+    with span("build", "language_comparison"):
+        fig, _ = build_language_comparison_figure(comp_df, selected_user)
+    plotly_chart(fig, "language_comparison:narrative_by_language", use_container_width=True)
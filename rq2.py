@@ -1,25 +1,15 @@
 import streamlit as st
-import pandas as pd
 import plotly.express as px
-from pathlib import Path
 
-def load_json(path):
-    return pd.read_json(path)
+from time_pyramid import available_levels, load_trend, series_date_range
+from figure_payload import plotly_chart
+from telemetry import span
 
-def show_rq2():
-    st.title("📈 RQ2: Narrative Evolution Over Time")
-    st.markdown("""
-    This section explores **how narrative, theme, and framing codes have evolved over time** during the Ukraine conflict, based on tweets from MEPs and US administrators.
-
-    Use the sidebar filter to focus on specific actor types (MEPs vs US Admins).
-    """)
-
-    # Sidebar
-    st.sidebar.markdown("### Filters")
-    actor_filter = st.sidebar.selectbox("Actor Type", ["All", "MEP", "US_Admin"])
-    metric = st.sidebar.radio("Metric", ["Count", "Percent"])
-
-    base_path = Path("insights")
+def build_rq2_figures(actor_filter="All", metric="Count", date_range=None, resolution="Auto"):
+    """Build the RQ2 trend figures and the tables behind them for the given filters"""
+    if date_range is None:
+        date_range = series_date_range("narrative")
+    actor_facets = 1 if actor_filter != "All" else 2
 
     def filter_df(df, y_field):
         if "created_month" in df.columns and "month" not in df.columns:
@@ -30,56 +20,105 @@ def show_rq2():
         return df, ycol
 
     #### 1. Narrative Over Time (Overall) ####
-    st.subheader("🧭 Narrative Trends Over Time (All Actors)")
-    df_narr = load_json(base_path / "rq2" / "narrative_over_time.json")
+    df_narr, level = load_trend("narrative", date_range, resolution)
     df_narr, ycol = filter_df(df_narr, metric)
-    fig = px.line(df_narr, x="month", y=ycol, color="narrative",
-                  markers=True, labels={"month": "Date", ycol: metric})
-    st.plotly_chart(fig, use_container_width=True)
-    st.caption("Tracks how narrative types (Pro-Ukraine, Pro-Russia, Neutral) shift over time across all accounts.")
+    fig = px.line(df_narr, x="period", y=ycol, color="narrative",
+                  markers=True, labels={"period": f"Date ({level})", ycol: metric})
 
     #### 2. Narrative Over Time by Actor ####
-    st.subheader("🧑‍⚖️ Narrative Trends by Actor Type")
-    df_narr_actor = load_json(base_path / "rq2" / "narrative_over_time_by_actor_type.json")
+    df_narr_actor, level = load_trend("narrative_by_actor_type", date_range, resolution, facet_cols=actor_facets)
     if actor_filter != "All":
         df_narr_actor = df_narr_actor[df_narr_actor["actor_type"] == actor_filter]
     df_narr_actor, ycol = filter_df(df_narr_actor, metric)
-    fig2 = px.line(df_narr_actor, x="month", y=ycol, color="narrative", line_dash="actor_type",
+    fig2 = px.line(df_narr_actor, x="period", y=ycol, color="narrative", line_dash="actor_type",
                    markers=True, facet_col="actor_type", facet_col_wrap=2,
-                   labels={"month": "Date", ycol: metric})
-    st.plotly_chart(fig2, use_container_width=True)
-    st.caption("Compares narrative evolution between MEPs and US administrators.")
+                   labels={"period": f"Date ({level})", ycol: metric})
 
     #### 3. Narrative Over Time by US Admin ####
-    st.subheader("🇺🇸 Narrative Trends by US Administration")
-    df_us = load_json(base_path / "rq2" / "narrative_over_time_by_us_admin.json")
+    df_us, level = load_trend("narrative_by_us_admin", date_range, resolution, facet_cols=2)
     df_us, ycol = filter_df(df_us, metric)
-    fig3 = px.line(df_us, x="month", y=ycol, color="narrative", line_dash="administration",
+    fig3 = px.line(df_us, x="period", y=ycol, color="narrative", line_dash="administration",
                    markers=True, facet_col="administration", facet_col_wrap=2,
-                   labels={"month": "Date", ycol: metric})
-    st.plotly_chart(fig3, use_container_width=True)
-    st.caption("Compares narrative evolution between Trump and Biden administrations.")
+                   labels={"period": f"Date ({level})", ycol: metric})
 
     #### 4. Theme Over Time ####
-    st.subheader("🎯 Themes Over Time")
-    df_theme = load_json(base_path / "rq2_themes_framing" / "theme_monthly_by_actor.json")
+    df_theme, level = load_trend("theme_by_actor", date_range, resolution, facet_cols=actor_facets)
     if actor_filter != "All":
         df_theme = df_theme[df_theme["actor_type"] == actor_filter]
     df_theme, ycol = filter_df(df_theme, metric)
-    fig_theme = px.line(df_theme, x="month", y=ycol, color="code",
+    fig_theme = px.line(df_theme, x="period", y=ycol, color="code",
                         markers=True, facet_col="actor_type", facet_col_wrap=2,
-                        labels={"month": "Date", ycol: metric})
-    st.plotly_chart(fig_theme, use_container_width=True)
-    st.caption("Shows which themes (e.g. sanctions, civilian impact, sovereignty) were most discussed over time.")
+                        labels={"period": f"Date ({level})", ycol: metric})
 
     #### 5. Framing Over Time ####
-    st.subheader("🪞 Framing Over Time")
-    df_frame = load_json(base_path / "rq2_themes_framing" / "framing_monthly_by_actor.json")
+    df_frame, level = load_trend("framing_by_actor", date_range, resolution, facet_cols=actor_facets)
     if actor_filter != "All":
         df_frame = df_frame[df_frame["actor_type"] == actor_filter]
     df_frame, ycol = filter_df(df_frame, metric)
-    fig_frame = px.line(df_frame, x="month", y=ycol, color="code",
+    fig_frame = px.line(df_frame, x="period", y=ycol, color="code",
                         markers=True, facet_col="actor_type", facet_col_wrap=2,
-                        labels={"month": "Date", ycol: metric})
-    st.plotly_chart(fig_frame, use_container_width=True)
+                        labels={"period": f"Date ({level})", ycol: metric})
+
+    figures = {
+        "narrative": fig,
+        "narrative_by_actor_type": fig2,
+        "narrative_by_us_admin": fig3,
+        "themes": fig_theme,
+        "framing": fig_frame,
+    }
+    tables = {
+        "narrative": df_narr,
+        "narrative_by_actor_type": df_narr_actor,
+        "narrative_by_us_admin": df_us,
+        "themes": df_theme,
+        "framing": df_frame,
+    }
+    return figures, tables
+
+def show_rq2():
+    st.title("📈 RQ2: Narrative Evolution Over Time")
+    st.markdown("""
+    This section explores **how narrative, theme, and framing codes have evolved over time** during the Ukraine conflict, based on tweets from MEPs and US administrators.
+
+    Use the sidebar filter to focus on specific actor types (MEPs vs US Admins).
+    """)
+
+    # Sidebar
+    st.sidebar.markdown("### Filters")
+    actor_filter = st.sidebar.selectbox("Actor Type", ["All", "MEP", "US_Admin"])
+    metric = st.sidebar.radio("Metric", ["Count", "Percent"])
+
+    min_date, max_date = series_date_range("narrative")
+    date_range = st.sidebar.slider("Date Range", min_value=min_date, max_value=max_date,
+                                   value=(min_date, max_date), format="YYYY-MM-DD")
+    resolution = st.sidebar.selectbox(
+        "Time Resolution", ["Auto"] + [level.capitalize() for level in available_levels("narrative")]
+    )
+
+    with span("build", "rq2"):
+        figures, _ = build_rq2_figures(actor_filter, metric, date_range, resolution)
+
+    #### 1. Narrative Over Time (Overall) ####
+    st.subheader("🧭 Narrative Trends Over Time (All Actors)")
+    plotly_chart(figures["narrative"], "rq2:narrative", use_container_width=True)
+    st.caption("Tracks how narrative types (Pro-Ukraine, Pro-Russia, Neutral) shift over time across all accounts.")
+
+    #### 2. Narrative Over Time by Actor ####
+    st.subheader("🧑‍⚖️ Narrative Trends by Actor Type")
+    plotly_chart(figures["narrative_by_actor_type"], "rq2:narrative_by_actor_type", use_container_width=True)
+    st.caption("Compares narrative evolution between MEPs and US administrators.")
+
+    #### 3. Narrative Over Time by US Admin ####
+    st.subheader("🇺🇸 Narrative Trends by US Administration")
+    plotly_chart(figures["narrative_by_us_admin"], "rq2:narrative_by_us_admin", use_container_width=True)
+    st.caption("Compares narrative evolution between Trump and Biden administrations.")
+
+    #### 4. Theme Over Time ####
+    st.subheader("🎯 Themes Over Time")
+    plotly_chart(figures["themes"], "rq2:themes", use_container_width=True)
+    st.caption("Shows which themes (e.g. sanctions, civilian impact, sovereignty) were most discussed over time.")
+
+    #### 5. Framing Over Time ####
+    st.subheader("🪞 Framing Over Time")
+    plotly_chart(figures["framing"], "rq2:framing", use_container_width=True)
     st.caption("Displays how rhetorical strategies (e.g. moral framing, security, demonization) changed over time.")
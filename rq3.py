@@ -1,44 +1,33 @@
 import streamlit as st
-import pandas as pd
 import plotly.express as px
 from pathlib import Path
 
-def load_json(path):
-    return pd.read_json(path)
+from time_pyramid import available_levels, load_trend, series_date_range
+from figure_payload import plotly_chart
+from telemetry import read_json, span
 
-def show_rq3():
-    st.title("📊 RQ3: Engagement Dynamics")
+ENGAGEMENT_METRICS = {
+    "total_engagement": "Total Engagement",
+    "likeCount": "Likes",
+    "retweetCount": "Retweets",
+    "replyCount": "Replies",
+    "quoteCount": "Quotes"
+}
 
-    st.markdown("""
-    This section analyzes engagement metrics (likes, retweets, replies, quotes) 
-    across narratives, actors, and over time.
+def load_json(path):
+    return read_json(path)
 
-    Use the sidebar to select the engagement metric displayed in the charts.
-    """)
-
-    # Sidebar filter
-    st.sidebar.markdown("### Filters")
-    engagement_metric = st.sidebar.selectbox(
-        "Select Engagement Metric",
-        options=["total_engagement", "likeCount", "retweetCount", "replyCount", "quoteCount"],
-        format_func=lambda x: {
-            "total_engagement": "Total Engagement",
-            "likeCount": "Likes",
-            "retweetCount": "Retweets",
-            "replyCount": "Replies",
-            "quoteCount": "Quotes"
-        }[x],
-        index=0
-    )
+def build_rq3_figures(engagement_metric="total_engagement", date_range=None, resolution="Auto"):
+    """Build the RQ3 engagement figures and the tables behind them for the given filters"""
+    if date_range is None:
+        date_range = series_date_range("engagement")
 
     base_path = Path("insights")
 
     #### 1. Total Engagement by Narrative & Actor Type ####
-    st.subheader("Total Engagement by Narrative and Actor Type")
     df_actor = load_json(base_path / "rq3" / "narrative_engagement_by_actor_type.json")
 
     if engagement_metric != "total_engagement" and engagement_metric not in df_actor.columns:
-        st.warning(f"Metric '{engagement_metric}' not available in dataset. Showing Total Engagement instead.")
         y_col = "total_engagement"
     else:
         y_col = engagement_metric
@@ -52,16 +41,9 @@ def show_rq3():
         labels={"narrative": "Narrative Type", y_col: engagement_metric.replace("Count", "")},
         title="Engagement by Narrative and Actor Type"
     )
-    st.plotly_chart(fig_actor, use_container_width=True)
-    st.caption("Shows engagement split by narrative and actor type (MEPs vs US administrators).")
 
     #### 2. Engagement Trends Over Time ####
-    st.subheader("Engagement Trends Over Time")
-    df_time = load_json(base_path / "rq3" / "narrative_engagement_over_time.json")
-
-    # Normalize time column
-    if "created_month" in df_time.columns and "month" not in df_time.columns:
-        df_time = df_time.rename(columns={"created_month": "month"})
+    df_time, level = load_trend("engagement", date_range, resolution)
 
     if engagement_metric != "total_engagement" and engagement_metric not in df_time.columns:
         y_col_time = "total_engagement"
@@ -70,18 +52,15 @@ def show_rq3():
 
     fig_time = px.line(
         df_time,
-        x="month",
+        x="period",
         y=y_col_time,
         color="narrative",
         markers=True,
-        labels={"month": "Date", y_col_time: engagement_metric.replace("Count", "")},
+        labels={"period": f"Date ({level})", y_col_time: engagement_metric.replace("Count", "")},
         title="Engagement Over Time by Narrative"
     )
-    st.plotly_chart(fig_time, use_container_width=True)
-    st.caption("Tracks how engagement changes over time across narratives.")
 
     #### 3. Average Engagement per Tweet by Actor Type ####
-    st.subheader("Average Engagement per Tweet by Actor Type")
     df_avg_actor = load_json(base_path / "rq3" / "narrative_avg_engagement_by_actor_type.json")
 
     # Always use 'avg_engagement' for average engagement datasets
@@ -96,11 +75,8 @@ def show_rq3():
         labels={"narrative": "Narrative Type", y_col_avg_actor: f"Average {engagement_metric.replace('Count','')}"},
         title="Average Engagement per Tweet by Narrative and Actor Type"
     )
-    st.plotly_chart(fig_avg_actor, use_container_width=True)
-    st.caption("Shows average engagement per tweet to normalize popularity.")
 
     #### 4. Average Engagement per Tweet by US Administration ####
-    st.subheader("Average Engagement per Tweet by US Administration")
     df_avg_admin = load_json(base_path / "rq3" / "narrative_avg_engagement_by_us_admin.json")
 
     # Always use 'avg_engagement' for average engagement datasets
@@ -115,11 +91,8 @@ def show_rq3():
         labels={"narrative": "Narrative Type", y_col_avg_admin: f"Average {engagement_metric.replace('Count','')}"},
         title="Average Engagement per Tweet by Narrative and US Administration"
     )
-    st.plotly_chart(fig_avg_admin, use_container_width=True)
-    st.caption("Comparison of average engagement between Trump and Biden administrations.")
 
     #### 5. Bonus: Theme Engagement ####
-    st.subheader("Bonus: Average Engagement by Themes")
     df_theme_eng = load_json(base_path / "rq3_themes_framing" / "theme_engagement.json")
 
     if engagement_metric not in df_theme_eng.columns:
@@ -134,11 +107,8 @@ def show_rq3():
         labels={"code": "Theme", y_col_theme: f"Average {engagement_metric.replace('Count','')}"},
         title="Average Engagement by Theme"
     )
-    st.plotly_chart(fig_theme_eng, use_container_width=True)
-    st.caption("Shows which themes receive more engagement on average.")
 
     #### 6. Bonus: Framing Engagement ####
-    st.subheader("Bonus: Average Engagement by Framing")
     df_frame_eng = load_json(base_path / "rq3_themes_framing" / "framing_engagement.json")
 
     if engagement_metric not in df_frame_eng.columns:
@@ -153,5 +123,82 @@ def show_rq3():
         labels={"code": "Framing", y_col_frame: f"Average {engagement_metric.replace('Count','')}"},
         title="Average Engagement by Framing"
     )
-    st.plotly_chart(fig_frame_eng, use_container_width=True)
+
+    figures = {
+        "engagement_by_actor_type": fig_actor,
+        "engagement_over_time": fig_time,
+        "avg_engagement_by_actor_type": fig_avg_actor,
+        "avg_engagement_by_us_admin": fig_avg_admin,
+        "theme_engagement": fig_theme_eng,
+        "framing_engagement": fig_frame_eng,
+    }
+    tables = {
+        "engagement_by_actor_type": df_actor,
+        "engagement_over_time": df_time,
+        "avg_engagement_by_actor_type": df_avg_actor,
+        "avg_engagement_by_us_admin": df_avg_admin,
+        "theme_engagement": df_theme_eng,
+        "framing_engagement": df_frame_eng,
+    }
+    return figures, tables
+
+def show_rq3():
+    st.title("📊 RQ3: Engagement Dynamics")
+
+    st.markdown("""
+    This section analyzes engagement metrics (likes, retweets, replies, quotes) 
+    across narratives, actors, and over time.
+
+    Use the sidebar to select the engagement metric displayed in the charts.
+    """)
+
+    # Sidebar filter
+    st.sidebar.markdown("### Filters")
+    engagement_metric = st.sidebar.selectbox(
+        "Select Engagement Metric",
+        options=list(ENGAGEMENT_METRICS),
+        format_func=lambda x: ENGAGEMENT_METRICS[x],
+        index=0
+    )
+
+    min_date, max_date = series_date_range("engagement")
+    date_range = st.sidebar.slider("Date Range", min_value=min_date, max_value=max_date,
+                                   value=(min_date, max_date), format="YYYY-MM-DD")
+    resolution = st.sidebar.selectbox(
+        "Time Resolution", ["Auto"] + [level.capitalize() for level in available_levels("engagement")]
+    )
+
+    with span("build", "rq3"):
+        figures, tables = build_rq3_figures(engagement_metric, date_range, resolution)
+
+    #### 1. Total Engagement by Narrative & Actor Type ####
+    st.subheader("Total Engagement by Narrative and Actor Type")
+    if engagement_metric not in tables["engagement_by_actor_type"].columns:
+        st.warning(f"Metric '{engagement_metric}' not available in dataset. Showing Total Engagement instead.")
+    plotly_chart(figures["engagement_by_actor_type"], "rq3:engagement_by_actor_type", use_container_width=True)
+    st.caption("Shows engagement split by narrative and actor type (MEPs vs US administrators).")
+
+    #### 2. Engagement Trends Over Time ####
+    st.subheader("Engagement Trends Over Time")
+    plotly_chart(figures["engagement_over_time"], "rq3:engagement_over_time", use_container_width=True)
+    st.caption("Tracks how engagement changes over time across narratives.")
+
+    #### 3. Average Engagement per Tweet by Actor Type ####
+    st.subheader("Average Engagement per Tweet by Actor Type")
+    plotly_chart(figures["avg_engagement_by_actor_type"], "rq3:avg_engagement_by_actor_type", use_container_width=True)
+    st.caption("Shows average engagement per tweet to normalize popularity.")
+
+    #### 4. Average Engagement per Tweet by US Administration ####
+    st.subheader("Average Engagement per Tweet by US Administration")
+    plotly_chart(figures["avg_engagement_by_us_admin"], "rq3:avg_engagement_by_us_admin", use_container_width=True)
+    st.caption("Comparison of average engagement between Trump and Biden administrations.")
+
+    #### 5. Bonus: Theme Engagement ####
+    st.subheader("Bonus: Average Engagement by Themes")
+    plotly_chart(figures["theme_engagement"], "rq3:theme_engagement", use_container_width=True)
+    st.caption("Shows which themes receive more engagement on average.")
+
+    #### 6. Bonus: Framing Engagement ####
+    st.subheader("Bonus: Average Engagement by Framing")
+    plotly_chart(figures["framing_engagement"], "rq3:framing_engagement", use_container_width=True)
     st.caption("Shows which framing strategies receive more engagement on average.")
@@ -3,62 +3,64 @@ import pandas as pd
 import plotly.express as px
 from pathlib import Path
 
+from author_shards import SHARD_DIR, load_shard_index, shards_current, load_authors, author_frame, author_timeline_frame
+from figure_payload import plotly_chart
+from telemetry import read_json, span
+
 def load_json_with_rename(path):
-    df = pd.read_json(path)
+    df = read_json(path)
     if "author.userName" in df.columns:
         df.rename(columns={"author.userName": "userName"}, inplace=True)
     return df
 
-def show_rq4():
-    st.title("📊 RQ4: Main Narrative Shapers")
+def load_selected_authors(base_path, selected_authors):
+    """Read the selected authors from their shards, falling back to the full tables when the shards are missing or stale"""
+    shard_dir = base_path / SHARD_DIR.name
+    index = load_shard_index(shard_dir)
+    if index is not None and shards_current(base_path, index):
+        records = load_authors(selected_authors, shard_dir, index["num_shards"])
+        return author_frame(records, "theme"), author_frame(records, "framing"), author_timeline_frame(records)
 
-    st.markdown("""
-    This section identifies and analyzes the key narrative shapers driving engagement.
-    Use the filters below to narrow down by actor type, country, administration, or political group.
-    Select one or more authors from the leaderboard to explore their narrative, theme, and framing distributions.
-    """)
+    df_theme_dist = load_json_with_rename(base_path / "rq4_themes_framing" / "theme_distribution_by_author.json")
+    df_framing_dist = load_json_with_rename(base_path / "rq4_themes_framing" / "framing_distribution_by_author.json")
+    return (
+        df_theme_dist[df_theme_dist["userName"].isin(selected_authors)],
+        df_framing_dist[df_framing_dist["userName"].isin(selected_authors)],
+        pd.DataFrame(),
+    )
 
-    base_path = Path("insights")
+TIMELINE_KINDS = ["narrative", "themes", "framing"]
 
-    # Load datasets
+# Leaderboard table columns, including the flattened narrative distribution
+LEADERBOARD_DISPLAY_COLS = [
+    "userName", "name", "actor_type", "followers", "tweet_count", "total_engagement",
+    "narrative_N-1", "narrative_N-2", "narrative_N-3"
+]
+
+def load_leaderboard(base_path):
     df_leaderboard = load_json_with_rename(base_path / "rq4" / "narrative_shapers_leaderboard.json")
-    df_theme_dist = load_json_with_rename(base_path / "rq4_themes_framing" / "theme_distribution_by_author.json")
-    df_framing_dist = load_json_with_rename(base_path / "rq4_themes_framing" / "framing_distribution_by_author.json")
 
     # Fix for list fields to ensure filtering works
     for col in ["administration", "politicalGroup", "country"]:
         df_leaderboard[col] = df_leaderboard[col].apply(lambda x: x if isinstance(x, list) else [])
+    return df_leaderboard
 
-    # Sidebar Filters
-    st.sidebar.header("Filters")
-    actor_types = ["All"] + sorted(df_leaderboard["actor_type"].unique())
-    selected_actor_type = st.sidebar.selectbox("Actor Type", actor_types)
-
-    countries = ["All"] + sorted({c for sublist in df_leaderboard["country"] for c in sublist})
-    selected_country = st.sidebar.selectbox("Country", countries)
-
-    administrations = ["All"] + sorted({a for sublist in df_leaderboard["administration"] for a in sublist})
-    selected_admin = st.sidebar.selectbox("Administration", administrations)
-
-    political_groups = ["All"] + sorted({pg for sublist in df_leaderboard["politicalGroup"] for pg in sublist})
-    selected_political_group = st.sidebar.selectbox("Political Group", political_groups)
-
-    search_term = st.sidebar.text_input("Search by username or name").strip().lower()
-
-    # Apply filters
+def filter_leaderboard(df_leaderboard, actor_type="All", country="All", admin="All",
+                       political_group="All", search_term=""):
+    """Apply the leaderboard filters, sort by engagement and flatten the narrative distribution"""
     df_filtered = df_leaderboard.copy()
 
-    if selected_actor_type != "All":
-        df_filtered = df_filtered[df_filtered["actor_type"] == selected_actor_type]
+    if actor_type != "All":
+        df_filtered = df_filtered[df_filtered["actor_type"] == actor_type]
 
-    if selected_country != "All":
-        df_filtered = df_filtered[df_filtered["country"].apply(lambda clist: selected_country in clist)]
+    if country != "All":
+        df_filtered = df_filtered[df_filtered["country"].apply(lambda clist: country in clist)]
 
-    if selected_admin != "All":
-        df_filtered = df_filtered[df_filtered["administration"].apply(lambda alist: selected_admin in alist)]
+    if admin != "All":
+        df_filtered = df_filtered[df_filtered["administration"].apply(lambda alist: admin in alist)]
 
-    if selected_political_group != "All":
-        df_filtered = df_filtered[df_filtered["politicalGroup"].apply(lambda plist: selected_political_group in plist)]
+    if political_group != "All":
+        df_filtered = df_filtered[df_filtered["politicalGroup"].apply(lambda plist: political_group in plist)]
 
     if search_term:
         df_filtered = df_filtered[
@@ -69,16 +71,6 @@ def show_rq4():
     # Sort by total engagement descending
     df_filtered = df_filtered.sort_values("total_engagement", ascending=False).reset_index(drop=True)
 
-    st.write(f"### Leaderboard ({len(df_filtered)} authors)")
-
-    # Show leaderboard table with selected columns
-    leaderboard_display_cols = [
-        "userName", "name", "actor_type", "followers", "tweet_count", "total_engagement"
-    ]
-    # Add narrative distribution columns
-    for narrative_code in ["N-1", "N-2", "N-3"]:
-        leaderboard_display_cols.append(f"narrative_{narrative_code}")
-
     # Flatten narrative_distribution dict into separate columns for display
     def flatten_narrative_dist(row):
         dist = row.get("narrative_distribution", {})
@@ -86,27 +78,19 @@ def show_rq4():
             row[f"narrative_{k}"] = dist.get(k, 0.0)
         return row
 
-    df_filtered = df_filtered.apply(flatten_narrative_dist, axis=1)
-
-    st.dataframe(df_filtered[leaderboard_display_cols], use_container_width=True)
-
-    # Select authors for detailed analysis
-    st.markdown("### Select authors to analyze narrative, theme, and framing distribution")
-    selected_authors = st.multiselect(
-        "Select authors by username",
-        options=df_filtered["userName"].tolist()
-    )
+    if df_filtered.empty:
+        return df_filtered.reindex(columns=list(df_filtered.columns) + LEADERBOARD_DISPLAY_COLS[-3:])
+    return df_filtered.apply(flatten_narrative_dist, axis=1)
 
-    if not selected_authors:
-        st.info("Select one or more authors from the leaderboard to see detailed distributions.")
-        return
+def build_rq4_author_figures(base_path, df_filtered, selected_authors):
+    """Build the per-author figures for the selected authors. Figures without data are left out."""
+    # Load theme and framing distributions for the selected authors only
+    df_theme_sel, df_framing_sel, df_timeline_sel = load_selected_authors(base_path, selected_authors)
 
-    # Filter theme and framing distributions by selected authors
-    df_theme_sel = df_theme_dist[df_theme_dist["userName"].isin(selected_authors)]
-    df_framing_sel = df_framing_dist[df_framing_dist["userName"].isin(selected_authors)]
+    figures = {}
+    tables = {}
 
     # Narrative distribution chart for selected authors
-    st.markdown("### Narrative Distribution for Selected Authors")
     df_narrative_sel = df_filtered[df_filtered["userName"].isin(selected_authors)][
         ["userName", "narrative_N-1", "narrative_N-2", "narrative_N-3"]
     ]
@@ -121,7 +105,7 @@ def show_rq4():
     # Clean narrative names
     df_narrative_long["Narrative"] = df_narrative_long["Narrative"].str.replace("narrative_", "")
 
-    fig_narrative = px.bar(
+    figures["narrative"] = px.bar(
         df_narrative_long,
         x="userName",
         y="Percentage",
@@ -130,15 +114,12 @@ def show_rq4():
         title="Narrative Distribution per Author",
         labels={"userName": "Author Username", "Percentage": "Narrative Share (%)"}
     )
-    st.plotly_chart(fig_narrative, use_container_width=True)
+    tables["narrative"] = df_narrative_long
 
     # Theme distribution chart
-    st.markdown("### Theme Distribution for Selected Authors")
-    if df_theme_sel.empty:
-        st.info("No theme distribution data available for selected authors.")
-    else:
+    if not df_theme_sel.empty:
         theme_long = df_theme_sel.melt(id_vars=["userName"], var_name="code", value_name="value")
-        fig_theme = px.bar(
+        figures["theme"] = px.bar(
             theme_long,
             x="userName",
             y="value",
@@ -147,16 +128,12 @@ def show_rq4():
             title="Theme Distribution per Author",
             labels={"userName": "Author Username", "value": "Theme Share (%)", "code": "Theme"}
         )
-
-        st.plotly_chart(fig_theme, use_container_width=True)
+        tables["theme"] = theme_long
 
     # Framing distribution chart
-    st.markdown("### Framing Distribution for Selected Authors")
-    if df_framing_sel.empty:
-        st.info("No framing distribution data available for selected authors.")
-    else:
+    if not df_framing_sel.empty:
         framing_long = df_framing_sel.melt(id_vars=["userName"], var_name="code", value_name="value")
-        fig_framing = px.bar(
+        figures["framing"] = px.bar(
             framing_long,
             x="userName",
             y="value",
@@ -165,5 +142,116 @@ def show_rq4():
             title="Framing Distribution per Author",
             labels={"userName": "Author Username", "value": "Framing Share (%)", "code": "Framing"}
         )
+        tables["framing"] = framing_long
+
+    # Per-author trend charts
+    if not df_timeline_sel.empty:
+        for kind in TIMELINE_KINDS:
+            figures[f"trend_{kind}"] = px.line(
+                df_timeline_sel[df_timeline_sel["kind"] == kind],
+                x="created_month",
+                y="count",
+                color="code",
+                line_dash="userName",
+                markers=True,
+                title=f"Monthly {kind.capitalize()} Codes per Author",
+                labels={"created_month": "Date", "count": "Tweet Count", "code": "Code", "userName": "Author"}
+            )
+
+        df_eng = df_timeline_sel.drop_duplicates(["userName", "created_month"])
+        figures["trend_engagement"] = px.line(
+            df_eng,
+            x="created_month",
+            y="total_engagement",
+            color="userName",
+            markers=True,
+            title="Monthly Engagement per Author",
+            labels={"created_month": "Date", "total_engagement": "Total Engagement", "userName": "Author"}
+        )
+        tables["timeline"] = df_timeline_sel
+
+    return figures, tables
+
+def show_rq4():
+    st.title("📊 RQ4: Main Narrative Shapers")
+
+    st.markdown("""
+    This section identifies and analyzes the key narrative shapers driving engagement.
+    Use the filters below to narrow down by actor type, country, administration, or political group.
+    Select one or more authors from the leaderboard to explore their narrative, theme, and framing distributions.
+    """)
+
+    base_path = Path("insights")
+
+    # Load datasets
+    df_leaderboard = load_leaderboard(base_path)
+
+    # Sidebar Filters
+    st.sidebar.header("Filters")
+    actor_types = ["All"] + sorted(df_leaderboard["actor_type"].unique())
+    selected_actor_type = st.sidebar.selectbox("Actor Type", actor_types)
+
+    countries = ["All"] + sorted({c for sublist in df_leaderboard["country"] for c in sublist})
+    selected_country = st.sidebar.selectbox("Country", countries)
+
+    administrations = ["All"] + sorted({a for sublist in df_leaderboard["administration"] for a in sublist})
+    selected_admin = st.sidebar.selectbox("Administration", administrations)
+
+    political_groups = ["All"] + sorted({pg for sublist in df_leaderboard["politicalGroup"] for pg in sublist})
+    selected_political_group = st.sidebar.selectbox("Political Group", political_groups)
+
+    search_term = st.sidebar.text_input("Search by username or name").strip().lower()
+
+    # Apply filters
+    with span("transform", "rq4:leaderboard"):
+        df_filtered = filter_leaderboard(
+            df_leaderboard, selected_actor_type, selected_country, selected_admin,
+            selected_political_group, search_term
+        )
+
+    st.write(f"### Leaderboard ({len(df_filtered)} authors)")
+
+    # Show leaderboard table with selected columns
+    st.dataframe(df_filtered[LEADERBOARD_DISPLAY_COLS], use_container_width=True)
+
+    # Select authors for detailed analysis
+    st.markdown("### Select authors to analyze narrative, theme, and framing distribution")
+    selected_authors = st.multiselect(
+        "Select authors by username",
+        options=df_filtered["userName"].tolist()
+    )
+
+    if not selected_authors:
+        st.info("Select one or more authors from the leaderboard to see detailed distributions.")
+        return
+
+    with span("build", "rq4"):
+        figures, _ = build_rq4_author_figures(base_path, df_filtered, selected_authors)
+
+    # Narrative distribution chart for selected authors
+    st.markdown("### Narrative Distribution for Selected Authors")
+    plotly_chart(figures["narrative"], "rq4:narrative", use_container_width=True)
+
+    # Theme distribution chart
+    st.markdown("### Theme Distribution for Selected Authors")
+    if "theme" not in figures:
+        st.info("No theme distribution data available for selected authors.")
+    else:
+        plotly_chart(figures["theme"], "rq4:theme", use_container_width=True)
+
+    # Framing distribution chart
+    st.markdown("### Framing Distribution for Selected Authors")
+    if "framing" not in figures:
+        st.info("No framing distribution data available for selected authors.")
+    else:
+        plotly_chart(figures["framing"], "rq4:framing", use_container_width=True)
+
+    # Per-author trend chart
+    st.markdown("### Monthly Trends for Selected Authors")
+    if "trend_engagement" not in figures:
+        st.info("No monthly timeline data available for selected authors.")
+        return
 
-        st.plotly_chart(fig_framing, use_container_width=True)
+    timeline_kind = st.radio("Code type", TIMELINE_KINDS, horizontal=True)
+    plotly_chart(figures[f"trend_{timeline_kind}"], f"rq4:trend_{timeline_kind}", use_container_width=True)
+    plotly_chart(figures["trend_engagement"], "rq4:trend_engagement", use_container_width=True)
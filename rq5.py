@@ -1,13 +1,15 @@
 import streamlit as st
-import pandas as pd
 import plotly.express as px
 import os
 
+from figure_payload import plotly_chart
+from telemetry import read_json, span
+
 INSIGHTS_DIR = "insights/rq5"
 THEMES_FRAMING_DIR = "insights/rq5_themes_framing"
 
 def load_json(filepath):
-    return pd.read_json(filepath)
+    return read_json(filepath)
 
 def melt_code_columns(df, id_vars, prefix):
     """Helper to melt framing/theme data into long format"""
@@ -15,19 +17,15 @@ def melt_code_columns(df, id_vars, prefix):
     df_melted = df.melt(id_vars=id_vars, value_vars=value_vars, var_name=prefix[:-1], value_name="value")
     return df_melted
 
-def show_rq5():
-    st.header("RQ5: Variations in Narratives Across Contexts")
-
-    st.markdown("## 🗺️ Narrative, Theme, and Framing by Country")
-
-    # Load data
+def build_rq5_figures():
+    """Build the RQ5 country and administration figures and the tables behind them"""
     df_narrative_country = load_json(os.path.join(INSIGHTS_DIR, "narrative_by_country_block.json"))
     df_theme_country = load_json(os.path.join(THEMES_FRAMING_DIR, "theme_by_country.json"))
     df_framing_country = load_json(os.path.join(THEMES_FRAMING_DIR, "framing_by_country.json"))
+    df_theme_admin = load_json(os.path.join(THEMES_FRAMING_DIR, "theme_by_administration.json"))
+    df_framing_admin = load_json(os.path.join(THEMES_FRAMING_DIR, "framing_by_administration.json"))
 
     # --- Narrative Distribution by Country ---
-    st.markdown("### 📊 Narrative Distribution by Country Group")
-    st.markdown("This chart shows the share of each narrative category (Pro-Ukraine, Pro-Russia, Neutral) across country groupings.")
     fig1 = px.bar(
         df_narrative_country,
         x="group",
@@ -37,11 +35,8 @@ def show_rq5():
         labels={"group": "Country Group", "percent": "Narrative Share (%)", "narrative": "Narrative Type"},
         title="Narrative Types Across Countries"
     )
-    st.plotly_chart(fig1, use_container_width=True)
 
     # --- Theme Distribution by Country ---
-    st.markdown("### 📚 Theme Distribution by Country")
-    st.markdown("This chart shows the distribution of themes (e.g., sovereignty, civilian impact) across different countries.")
     df_theme_country_melted = melt_code_columns(df_theme_country, id_vars=["country"], prefix="T-")
     fig2 = px.bar(
         df_theme_country_melted,
@@ -52,11 +47,8 @@ def show_rq5():
         labels={"country": "Country", "value": "Theme Share (%)", "T": "Theme"},
         title="Themes Across Countries"
     )
-    st.plotly_chart(fig2, use_container_width=True)
 
     # --- Framing Strategies by Country ---
-    st.markdown("### 🧠 Framing Strategies by Country")
-    st.markdown("This chart shows how rhetorical framing varies across countries (e.g., moral, security, geopolitical).")
     df_framing_country_melted = melt_code_columns(df_framing_country, id_vars=["country"], prefix="F-")
     fig3 = px.bar(
         df_framing_country_melted,
@@ -67,16 +59,9 @@ def show_rq5():
         labels={"country": "Country", "value": "Framing Share (%)", "F": "Framing"},
         title="Framing Strategies Across Countries"
     )
-    st.plotly_chart(fig3, use_container_width=True)
-
-    st.markdown("## 🏛️ Theme and Framing by US Administration")
 
     # --- Theme Distribution by Administration ---
-    df_theme_admin = load_json(os.path.join(THEMES_FRAMING_DIR, "theme_by_administration.json"))
     df_theme_admin_melted = melt_code_columns(df_theme_admin, id_vars=["administration"], prefix="T-")
-
-    st.markdown("### 📚 Theme Distribution by US Administration")
-    st.markdown("This chart compares the distribution of themes during the Trump and Biden administrations.")
     fig4 = px.bar(
         df_theme_admin_melted,
         x="administration",
@@ -86,14 +71,9 @@ def show_rq5():
         labels={"administration": "Administration", "value": "Theme Share (%)", "T": "Theme"},
         title="Themes by US Administration"
     )
-    st.plotly_chart(fig4, use_container_width=True)
 
     # --- Framing Distribution by Administration ---
-    df_framing_admin = load_json(os.path.join(THEMES_FRAMING_DIR, "framing_by_administration.json"))
     df_framing_admin_melted = melt_code_columns(df_framing_admin, id_vars=["administration"], prefix="F-")
-
-    st.markdown("### 🧠 Framing Strategies by US Administration")
-    st.markdown("This chart displays rhetorical framing strategies (moral, geopolitical, security, etc.) used by Trump and Biden administrations.")
     fig5 = px.bar(
         df_framing_admin_melted,
         x="administration",
@@ -103,4 +83,54 @@ def show_rq5():
         labels={"administration": "Administration", "value": "Framing Share (%)", "F": "Framing"},
         title="Framing Strategies by US Administration"
     )
-    st.plotly_chart(fig5, use_container_width=True)
+
+    figures = {
+        "narrative_by_country": fig1,
+        "theme_by_country": fig2,
+        "framing_by_country": fig3,
+        "theme_by_administration": fig4,
+        "framing_by_administration": fig5,
+    }
+    tables = {
+        "narrative_by_country": df_narrative_country,
+        "theme_by_country": df_theme_country_melted,
+        "framing_by_country": df_framing_country_melted,
+        "theme_by_administration": df_theme_admin_melted,
+        "framing_by_administration": df_framing_admin_melted,
+    }
+    return figures, tables
+
+def show_rq5():
+    st.header("RQ5: Variations in Narratives Across Contexts")
+
+    with span("build", "rq5"):
+        figures, _ = build_rq5_figures()
+
+    st.markdown("## 🗺️ Narrative, Theme, and Framing by Country")
+
+    # --- Narrative Distribution by Country ---
+    st.markdown("### 📊 Narrative Distribution by Country Group")
+    st.markdown("This chart shows the share of each narrative category (Pro-Ukraine, Pro-Russia, Neutral) across country groupings.")
+    plotly_chart(figures["narrative_by_country"], "rq5:narrative_by_country", use_container_width=True)
+
+    # --- Theme Distribution by Country ---
+    st.markdown("### 📚 Theme Distribution by Country")
+    st.markdown("This chart shows the distribution of themes (e.g., sovereignty, civilian impact) across different countries.")
+    plotly_chart(figures["theme_by_country"], "rq5:theme_by_country", use_container_width=True)
+
+    # --- Framing Strategies by Country ---
+    st.markdown("### 🧠 Framing Strategies by Country")
+    st.markdown("This chart shows how rhetorical framing varies across countries (e.g., moral, security, geopolitical).")
+    plotly_chart(figures["framing_by_country"], "rq5:framing_by_country", use_container_width=True)
+
+    st.markdown("## 🏛️ Theme and Framing by US Administration")
+
+    # --- Theme Distribution by Administration ---
+    st.markdown("### 📚 Theme Distribution by US Administration")
+    st.markdown("This chart compares the distribution of themes during the Trump and Biden administrations.")
+    plotly_chart(figures["theme_by_administration"], "rq5:theme_by_administration", use_container_width=True)
+
+    # --- Framing Distribution by Administration ---
+    st.markdown("### 🧠 Framing Strategies by US Administration")
+    st.markdown("This chart displays rhetorical framing strategies (moral, geopolitical, security, etc.) used by Trump and Biden administrations.")
+    plotly_chart(figures["framing_by_administration"], "rq5:framing_by_administration", use_container_width=True)
@@ -0,0 +1,408 @@
+import argparse
+import hashlib
+import json
+import re
+import time
+from collections import defaultdict
+from functools import lru_cache
+from pathlib import Path
+
+import pandas as pd
+
+from telemetry import cache_result, inc, span
+
+# === Versioned, content-addressed insight snapshots ===
+# Publishing splits every insight table into chunks and stores each chunk once
+# under objects/<hash>. A version is a manifest listing, per table, the hashes
+# of its chunks; unchanged chunks are shared between versions, so a release only
+# writes the chunks that changed. CURRENT names the active version and checkout
+# rewrites only the insight files whose content differs.
+#
+# Publish and checkout also record the size and mtime of every insight file they
+# leave in sync with the current version (like git's index). While a file is
+# untouched, telemetry.read_json and the RQ4 author shards are served from the
+# parsed chunk cache instead of the file, so chunks shared by several versions
+# are parsed once per process. Files regenerated in place since then no longer
+# match and are read from disk until the next publish.
+#
+# Tables with a month column are chunked per month and author tables per
+# username initial. Chunks are contiguous runs of rows, so concatenating them
+# restores the original row order. Non-tabular files are stored as one chunk.
+#
+#   python snapshots.py publish -m "July regeneration"
+#   python snapshots.py list
+#   python snapshots.py diff <old> <new>
+#   python snapshots.py checkout <version>
+
+BASE_PATH = Path("insights")
+STORE_DIR = Path("snapshot_store")
+CURRENT_FILE = "CURRENT"
+WORKTREE_FILE = "worktree.json"
+
+MONTH_COLUMNS = ["month", "created_month", "period"]
+AUTHOR_COLUMNS = ["userName", "author.userName"]
+CODE_COLUMNS = ["code", "narrative", "themes", "framing"]
+WIDE_CODE_PATTERN = re.compile(r"^[NTF]-?\d+$")
+
+
+def _dumps(value):
+    return json.dumps(value, ensure_ascii=False, separators=(",", ":"))
+
+
+def _digest(data):
+    return hashlib.sha256(data).hexdigest()
+
+
+def partition_key(records):
+    """Return a function mapping a record to its chunk key, based on the table's columns"""
+    columns = records[0].keys() if records and isinstance(records[0], dict) else []
+    month_col = next((c for c in MONTH_COLUMNS if c in columns), None)
+    if month_col:
+        return lambda r: f"month={str(r.get(month_col))[:7]}"
+    author_col = next((c for c in AUTHOR_COLUMNS if c in columns), None)
+    if author_col:
+        return lambda r: f"author={str(r.get(author_col))[:1]}"
+    return lambda r: "all"
+
+
+def split_chunks(content):
+    """Split a parsed insight file into [(key, records)] runs; non-list files become a single raw chunk"""
+    if not isinstance(content, list) or not content:
+        return [("raw", content)]
+    key_of = partition_key(content)
+    chunks = []
+    for record in content:
+        key = key_of(record)
+        if chunks and chunks[-1][0] == key:
+            chunks[-1][1].append(record)
+        else:
+            chunks.append((key, [record]))
+    return chunks
+
+
+def _object_path(store_dir, digest):
+    return Path(store_dir) / "objects" / digest[:2] / f"{digest}.json"
+
+
+def _manifest_path(store_dir, version):
+    return Path(store_dir) / "manifests" / f"{version}.json"
+
+
+def _table_digest(chunks):
+    return _digest(_dumps([c["hash"] for c in chunks]).encode("utf-8"))
+
+
+def _file_stat(path):
+    stat = path.stat()
+    return [stat.st_size, stat.st_mtime_ns]
+
+
+def _frame_safe(path, records):
+    """Whether pd.DataFrame(records) gives the same frame as pd.read_json on the file"""
+    try:
+        pd.testing.assert_frame_equal(pd.read_json(path), pd.DataFrame(records))
+    except (AssertionError, ValueError):
+        return False
+    return True
+
+
+def _table_entries(base_path):
+    """Yield (table name, entry, [(chunk meta, bytes)], file stat) for every insight file"""
+    base_path = Path(base_path)
+    for path in sorted(base_path.rglob("*.json")):
+        # Stat before reading, so a file rewritten meanwhile never matches the recorded state
+        stat = _file_stat(path)
+        with open(path, "r", encoding="utf-8") as f:
+            content = json.load(f)
+        kind = "records" if isinstance(content, list) and content else "raw"
+        chunks = []
+        for key, value in split_chunks(content):
+            data = _dumps(value).encode("utf-8")
+            meta = {"key": key, "hash": _digest(data)}
+            if kind == "records":
+                meta["rows"] = len(value)
+            chunks.append((meta, data))
+        chunk_metas = [meta for meta, _ in chunks]
+        entry = {"kind": kind, "hash": _table_digest(chunk_metas), "chunks": chunk_metas}
+        if kind == "records":
+            entry["frame"] = _frame_safe(path, content)
+        yield path.relative_to(base_path).as_posix(), entry, chunks, stat
+
+
+def _write_worktree(store_dir, base_path, version, stats):
+    path = Path(store_dir) / WORKTREE_FILE
+    tmp = path.with_suffix(".tmp")
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump({"base_path": str(Path(base_path).resolve()), "version": version, "files": stats}, f)
+    tmp.replace(path)
+
+
+def publish(base_path=BASE_PATH, store_dir=STORE_DIR, message=""):
+    """Snapshot the insight files; only chunks not already in the store are written"""
+    store_dir = Path(store_dir)
+    tables = {}
+    stats = {}
+    written = 0
+    for table, entry, chunks, stat in _table_entries(base_path):
+        for meta, data in chunks:
+            path = _object_path(store_dir, meta["hash"])
+            if not path.exists():
+                path.parent.mkdir(parents=True, exist_ok=True)
+                tmp = path.with_suffix(".tmp")
+                tmp.write_bytes(data)
+                tmp.replace(path)
+                written += 1
+        tables[table] = entry
+        stats[table] = stat
+
+    # The version id only depends on the content, so republishing unchanged data is a no-op
+    version = _digest(_dumps({t: e["hash"] for t, e in tables.items()}).encode("utf-8"))[:12]
+    manifest_path = _manifest_path(store_dir, version)
+    if not manifest_path.exists():
+        manifest_path.parent.mkdir(parents=True, exist_ok=True)
+        manifest = {"version": version, "created": time.strftime("%Y-%m-%dT%H:%M:%S"), "message": message,
+                    "tables": tables}
+        with open(manifest_path, "w", encoding="utf-8") as f:
+            json.dump(manifest, f, ensure_ascii=False, indent=1)
+    set_current(version, store_dir)
+    _write_worktree(store_dir, base_path, version, stats)
+    return version, written
+
+
+@lru_cache(maxsize=64)
+def _load_manifest_cached(store_dir, version):
+    with open(_manifest_path(store_dir, version), "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def load_manifest(version, store_dir=STORE_DIR):
+    """Manifests are immutable, so the parsed manifest is cached and shared; don't modify it"""
+    return _load_manifest_cached(str(store_dir), version)
+
+
+def list_versions(store_dir=STORE_DIR):
+    manifests = [load_manifest(p.stem, store_dir) for p in (Path(store_dir) / "manifests").glob("*.json")]
+    return sorted(
+        ({"version": m["version"], "created": m["created"], "message": m["message"], "tables": len(m["tables"])}
+         for m in manifests),
+        key=lambda m: m["created"],
+    )
+
+
+def current_version(store_dir=STORE_DIR):
+    path = Path(store_dir) / CURRENT_FILE
+    return path.read_text(encoding="utf-8").strip() if path.exists() else None
+
+
+def set_current(version, store_dir=STORE_DIR):
+    load_manifest(version, store_dir)  # fails early for unknown versions
+    path = Path(store_dir) / CURRENT_FILE
+    tmp = path.with_suffix(".tmp")
+    tmp.write_text(version + "\n", encoding="utf-8")
+    tmp.replace(path)
+
+
+@lru_cache(maxsize=4096)
+def _read_chunk_cached(store_dir, digest):
+    # Chunks are immutable, so the cache is shared by every version that references them
+    path = _object_path(store_dir, digest)
+    inc("dashboard_bytes_loaded_total", path.stat().st_size, dataset="snapshot_chunk")
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _read_chunk(store_dir, digest):
+    hits = _read_chunk_cached.cache_info().hits
+    content = _read_chunk_cached(str(store_dir), digest)
+    cache_result("snapshot_chunk", _read_chunk_cached.cache_info().hits > hits)
+    return content
+
+
+def table_content(table, version=None, store_dir=STORE_DIR):
+    """Reassemble a table's original JSON content from its chunks; the records are shared with the chunk cache"""
+    version = version or current_version(store_dir)
+    entry = load_manifest(version, store_dir)["tables"][table]
+    with span("load", f"snapshot:{table}"):
+        if entry["kind"] == "raw":
+            return _read_chunk(store_dir, entry["chunks"][0]["hash"])
+        records = []
+        for chunk in entry["chunks"]:
+            records.extend(_read_chunk(store_dir, chunk["hash"]))
+        return records
+
+
+def load_table(table, version=None, store_dir=STORE_DIR):
+    """Load a tabular insight (e.g. "rq2/narrative_over_time.json") of a version as a DataFrame"""
+    return pd.DataFrame(table_content(table, version, store_dir))
+
+
+@lru_cache(maxsize=8)
+def _load_worktree_cached(path, mtime_ns):
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _synced_table(path, store_dir):
+    """Return (version, table) if the insight file at `path` is unchanged since the last publish/checkout"""
+    worktree_path = Path(store_dir) / WORKTREE_FILE
+    try:
+        state = _load_worktree_cached(str(worktree_path), worktree_path.stat().st_mtime_ns)
+        table = Path(path).resolve().relative_to(state["base_path"]).as_posix()
+        recorded = state["files"].get(table)
+        if recorded is None or recorded != _file_stat(Path(path)):
+            return None
+    except (OSError, ValueError):
+        return None
+    if state["version"] != current_version(store_dir):
+        return None
+    return state["version"], table
+
+
+def cached_content(path, store_dir=STORE_DIR):
+    """Parsed content of an insight file from the chunk cache, or None when it has to be read from disk"""
+    synced = _synced_table(path, store_dir)
+    if synced is None:
+        return None
+    version, table = synced
+    return table_content(table, version, store_dir)
+
+
+def read_frame(path, store_dir=STORE_DIR, **kwargs):
+    """pd.read_json equivalent served from the chunk cache, or None when the file has to be read from disk"""
+    dtype = kwargs.get("dtype")
+    if set(kwargs) - {"dtype", "convert_dates"} or (dtype is not None and not isinstance(dtype, dict)):
+        return None
+    synced = _synced_table(path, store_dir)
+    if synced is None:
+        return None
+    version, table = synced
+    if not load_manifest(version, store_dir)["tables"][table].get("frame"):
+        return None
+    df = pd.DataFrame(table_content(table, version, store_dir))
+    if dtype:
+        df = df.astype({col: t for col, t in dtype.items() if col in df.columns})
+    return df
+
+
+def checkout(version, base_path=BASE_PATH, store_dir=STORE_DIR):
+    """Make `version` current and rewrite only the insight files whose content differs"""
+    base_path = Path(base_path)
+    manifest = load_manifest(version, store_dir)
+    on_disk = {table: (entry, stat) for table, entry, _, stat in _table_entries(base_path)}
+
+    updated, removed = [], []
+    stats = {}
+    for table, entry in manifest["tables"].items():
+        current = on_disk.get(table)
+        if current is not None and current[0]["hash"] == entry["hash"]:
+            stats[table] = current[1]
+            continue
+        path = base_path / table
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(".tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(table_content(table, version, store_dir), f, ensure_ascii=False, indent=2)
+        tmp.replace(path)
+        stats[table] = _file_stat(path)
+        updated.append(table)
+    for table in sorted(set(on_disk) - set(manifest["tables"])):
+        (base_path / table).unlink()
+        removed.append(table)
+
+    set_current(version, store_dir)
+    _write_worktree(store_dir, base_path, version, stats)
+    return updated, removed
+
+
+def _row_identity(record):
+    return tuple(
+        (k, str(v)) for k, v in record.items()
+        if k in MONTH_COLUMNS + AUTHOR_COLUMNS + CODE_COLUMNS + ["actor_type", "administration", "country", "group"]
+    )
+
+
+def _describe_rows(old_rows, new_rows, changes):
+    old_set = {_dumps(r) for r in old_rows}
+    new_set = {_dumps(r) for r in new_rows}
+    changed = [json.loads(r) for r in (old_set ^ new_set)]
+    old_by_id = {_row_identity(r): r for r in old_rows}
+    for row in changed:
+        if not isinstance(row, dict):
+            continue
+        for col in MONTH_COLUMNS:
+            if col in row:
+                changes["months"].add(str(row[col])[:7])
+        for col in AUTHOR_COLUMNS:
+            if col in row:
+                changes["authors"].add(row[col])
+        for col in CODE_COLUMNS:
+            if isinstance(row.get(col), str):
+                changes["codes"].add(row[col])
+        # Wide tables hold one column per code (e.g. T-1 ... T-5)
+        previous = old_by_id.get(_row_identity(row), {})
+        for col, value in row.items():
+            if WIDE_CODE_PATTERN.match(col) and previous.get(col) != value:
+                changes["codes"].add(col)
+
+
+def diff(old_version, new_version, store_dir=STORE_DIR):
+    """Report added/removed/changed tables and the months, authors and codes touched by the changes"""
+    old = load_manifest(old_version, store_dir)["tables"]
+    new = load_manifest(new_version, store_dir)["tables"]
+    report = {
+        "added": sorted(set(new) - set(old)),
+        "removed": sorted(set(old) - set(new)),
+        "changed": {},
+    }
+    for table in sorted(set(old) & set(new)):
+        if old[table]["hash"] == new[table]["hash"]:
+            continue
+        # A key repeats when a table is not sorted by its partition column, so compare all runs of a key together
+        old_chunks, new_chunks = defaultdict(list), defaultdict(list)
+        for chunks, entry in [(old_chunks, old[table]), (new_chunks, new[table])]:
+            for chunk in entry["chunks"]:
+                chunks[chunk["key"]].append(chunk["hash"])
+        changed_keys = sorted(k for k in set(old_chunks) | set(new_chunks) if old_chunks.get(k) != new_chunks.get(k))
+
+        changes = {"chunks": changed_keys, "months": set(), "authors": set(), "codes": set()}
+        if new[table]["kind"] == "records" and old[table]["kind"] == "records":
+            for key in changed_keys:
+                old_rows = [row for digest in old_chunks.get(key, []) for row in _read_chunk(store_dir, digest)]
+                new_rows = [row for digest in new_chunks.get(key, []) for row in _read_chunk(store_dir, digest)]
+                _describe_rows(old_rows, new_rows, changes)
+        report["changed"][table] = {k: sorted(v) if isinstance(v, set) else v for k, v in changes.items()}
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Versioned, content-addressed snapshots of insights/.")
+    parser.add_argument("--insights", default=str(BASE_PATH), help="Insights directory")
+    parser.add_argument("--store", default=str(STORE_DIR), help="Snapshot store directory")
+    sub = parser.add_subparsers(dest="command", required=True)
+    publish_parser = sub.add_parser("publish", help="Snapshot the current insight files")
+    publish_parser.add_argument("-m", "--message", default="")
+    sub.add_parser("list", help="List published versions")
+    diff_parser = sub.add_parser("diff", help="Compare two versions")
+    diff_parser.add_argument("old")
+    diff_parser.add_argument("new", nargs="?", help="Defaults to the current version")
+    checkout_parser = sub.add_parser("checkout", help="Switch insights/ to a published version")
+    checkout_parser.add_argument("version")
+    args = parser.parse_args()
+
+    if args.command == "publish":
+        version, written = publish(args.insights, args.store, args.message)
+        print(f"Published {version} ({written} new chunks)")
+    elif args.command == "list":
+        current = current_version(args.store)
+        for v in list_versions(args.store):
+            marker = "*" if v["version"] == current else " "
+            print(f"{marker} {v['version']}  {v['created']}  {v['tables']} tables  {v['message']}")
+    elif args.command == "diff":
+        print(json.dumps(diff(args.old, args.new or current_version(args.store), args.store), indent=2, ensure_ascii=False))
+    elif args.command == "checkout":
+        updated, removed = checkout(args.version, args.insights, args.store)
+        print(f"Checked out {args.version}: {len(updated)} files rewritten, {len(removed)} removed")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,203 @@
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from functools import lru_cache
+from pathlib import Path
+
+import streamlit as st
+import pandas as pd
+
+from telemetry import cache_result, read_json, span
+
+# === Ad-hoc SQL over the compiled insight tables ===
+# Every insights/<dir>/.../<file>.json table is registered as a relation named
+# after its path, e.g. rq2__narrative_over_time or time_pyramid__narrative__quarter,
+# in a shared in-memory sqlite database. User queries run under
+# an authorizer that only permits reading, and the database is rebuilt when the
+# insight files change.
+
+BASE_PATH = Path("insights")
+SKIP_DIRS = {"rq4_authors"}
+SKIP_FILES = {"index.json"}
+INDEXED_COLUMNS = ["month", "created_month", "period", "code", "actor_type", "userName"]
+
+DEFAULT_MAX_ROWS = 5000
+DEFAULT_TIMEOUT = 5.0
+
+# Everything else (PRAGMA, ATTACH, DDL, DML, transactions) is denied for user queries
+ALLOWED_ACTIONS = {sqlite3.SQLITE_SELECT, sqlite3.SQLITE_READ, sqlite3.SQLITE_FUNCTION, sqlite3.SQLITE_RECURSIVE}
+
+_db_lock = threading.Lock()
+_db = None
+_db_version = None
+
+
+def table_name(path, base_path=BASE_PATH):
+    return "__".join(path.relative_to(base_path).with_suffix("").parts)
+
+
+def insight_files(base_path=BASE_PATH):
+    """All insight JSON files at any depth, except the folders in SKIP_DIRS and the index files"""
+    base_path = Path(base_path)
+    return [
+        path for path in sorted(base_path.rglob("*.json"))
+        if path.relative_to(base_path).parts[0] not in SKIP_DIRS and path.name not in SKIP_FILES
+    ]
+
+
+def _to_sql_value(value):
+    if isinstance(value, (list, dict)):
+        return json.dumps(value, ensure_ascii=False)
+    return value
+
+
+def load_insight_table(path):
+    df = read_json(path)
+    if "author.userName" in df.columns:
+        df = df.rename(columns={"author.userName": "userName"})
+    for col in df.columns:
+        if df[col].dtype == object:
+            df[col] = df[col].apply(_to_sql_value)
+    return df
+
+
+def insights_version(base_path=BASE_PATH):
+    """Cheap fingerprint of the insight files from their names, sizes and modification times"""
+    digest = hashlib.sha1()
+    for path in insight_files(base_path):
+        stat = path.stat()
+        digest.update(f"{table_name(path, base_path)}:{stat.st_size}:{stat.st_mtime_ns}".encode("utf-8"))
+    return digest.hexdigest()[:16]
+
+
+def _authorize(action, *args):
+    return sqlite3.SQLITE_OK if action in ALLOWED_ACTIONS else sqlite3.SQLITE_DENY
+
+
+def build_database(base_path=BASE_PATH):
+    conn = sqlite3.connect(":memory:", check_same_thread=False)
+    for path in insight_files(base_path):
+        name = table_name(path, base_path)
+        df = load_insight_table(path)
+        df.to_sql(name, conn, index=False)
+        for col in INDEXED_COLUMNS:
+            if col in df.columns:
+                conn.execute(f'CREATE INDEX "idx_{name}_{col}" ON "{name}" ("{col}")')
+    # The JSON table-valued functions declare their schema on first use, which the authorizer would deny
+    conn.execute("SELECT * FROM json_each('[]'), json_tree('[]')").fetchall()
+    conn.commit()
+    return conn
+
+
+def get_database():
+    """Return (connection, version), rebuilding the database when the insight files have changed"""
+    global _db, _db_version
+    version = insights_version()
+    with _db_lock:
+        if _db is None or _db_version != version:
+            _db = build_database()
+            _db_version = version
+        return _db, version
+
+
+def list_tables():
+    conn, _ = get_database()
+    with _db_lock:
+        rows = conn.execute("SELECT name FROM sqlite_master WHERE type = 'table' ORDER BY name").fetchall()
+        return {
+            name: [col[1] for col in conn.execute(f'PRAGMA table_info("{name}")').fetchall()]
+            for (name,) in rows
+        }
+
+
+@lru_cache(maxsize=128)
+def _run_query_cached(version, sql, max_rows, timeout):
+    # `version` only keys the cache, so results computed on older insight files are not reused
+    conn, _ = get_database()
+    deadline = time.monotonic() + timeout
+
+    # Returning a truthy value from the progress handler aborts the statement
+    def check_deadline():
+        return time.monotonic() > deadline
+
+    with _db_lock:
+        conn.set_progress_handler(check_deadline, 10000)
+        conn.set_authorizer(_authorize)
+        try:
+            cursor = conn.execute(sql)
+            columns = [d[0] for d in cursor.description or []]
+            rows = cursor.fetchmany(max_rows + 1)
+        except sqlite3.OperationalError as e:
+            if str(e) == "interrupted":
+                raise TimeoutError(f"Query exceeded the {timeout:g}s time limit") from e
+            raise
+        finally:
+            conn.set_authorizer(None)
+            conn.set_progress_handler(None, 0)
+
+    truncated = len(rows) > max_rows
+    return pd.DataFrame(rows[:max_rows], columns=columns), truncated
+
+
+def run_query(sql, max_rows=DEFAULT_MAX_ROWS, timeout=DEFAULT_TIMEOUT):
+    """Run a read-only query and return (DataFrame, truncated). Results are cached per query."""
+    _, version = get_database()
+    hits = _run_query_cached.cache_info().hits
+    with span("transform", "sql_query"):
+        df, truncated = _run_query_cached(version, sql.strip().rstrip(";"), int(max_rows), float(timeout))
+    cache_result("sql_query", _run_query_cached.cache_info().hits > hits)
+    return df.copy(), truncated
+
+
+def show_sql_query():
+    st.title("🧮 Ad-hoc SQL Query")
+
+    st.markdown("""
+    Run your own aggregations over the compiled insight tables. Every insight file is available as a table
+    named after its path, `<folder>__<file>` (e.g. `rq2__narrative_over_time`, `time_pyramid__narrative__quarter`).
+    List and dict fields are stored as JSON text
+    and can be unpacked with `json_extract` / `json_each`.
+
+    Queries are read-only, limited in run time and number of returned rows, and results are cached.
+    """)
+
+    tables = list_tables()
+    with st.expander("📚 Available tables"):
+        for name, columns in tables.items():
+            st.markdown(f"- `{name}`: {', '.join(f'`{c}`' for c in columns)}")
+
+    st.sidebar.markdown("### Query Limits")
+    max_rows = st.sidebar.number_input("Max rows", min_value=10, max_value=50000, value=DEFAULT_MAX_ROWS, step=100)
+    timeout = st.sidebar.number_input("Timeout (seconds)", min_value=0.5, max_value=30.0, value=DEFAULT_TIMEOUT, step=0.5)
+
+    sql = st.text_area(
+        "SQL query",
+        value=(
+            "SELECT month, actor_type, code, SUM(count) AS count\n"
+            "FROM rq2_themes_framing__theme_monthly_by_actor\n"
+            "WHERE month >= '2022-02'\n"
+            "GROUP BY month, actor_type, code\n"
+            "ORDER BY month"
+        ),
+        height=180,
+    )
+
+    if not st.button("Run query"):
+        return
+
+    try:
+        df, truncated = run_query(sql, max_rows=max_rows, timeout=timeout)
+    except TimeoutError as e:
+        st.error(str(e))
+        return
+    except sqlite3.Error as e:
+        st.error(f"Query failed: {e}")
+        return
+
+    if truncated:
+        st.warning(f"Result truncated to the first {max_rows} rows.")
+    st.write(f"### Result ({len(df)} rows)")
+    st.dataframe(df, use_container_width=True)
+    st.download_button("Download CSV", df.to_csv(index=False), file_name="query_result.csv", mime="text/csv")
@@ -0,0 +1,222 @@
+import contextvars
+import json
+import os
+import random
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import pandas as pd
+
+# === Operational metrics and tracing ===
+# Spans time the stages of a dashboard run (tab, file load, DataFrame
+# transform, figure build, chart send) and feed Prometheus-style counters and
+# histograms. Metrics are served in Prometheus text format on a local port, and
+# a sampled share of tab runs is appended to a JSON lines trace log.
+#
+#   DASHBOARD_METRICS_PORT   port of the local /metrics endpoint (default 9464, 0 disables)
+#   DASHBOARD_TRACE_SAMPLE   fraction of tab runs written to the trace log (default 0)
+#   DASHBOARD_TRACE_LOG      trace log path (default traces.jsonl)
+
+METRICS_PORT = int(os.environ.get("DASHBOARD_METRICS_PORT", "9464"))
+TRACE_SAMPLE_RATE = float(os.environ.get("DASHBOARD_TRACE_SAMPLE", "0"))
+TRACE_LOG = Path(os.environ.get("DASHBOARD_TRACE_LOG", "traces.jsonl"))
+
+SESSION_TIMEOUT = 300
+BUCKETS = [0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0]
+
+METRIC_HELP = {
+    "dashboard_span_seconds": ("histogram", "Duration of dashboard spans by kind and name"),
+    "dashboard_tab_seconds": ("histogram", "End-to-end latency of a tab run"),
+    "dashboard_cache_requests_total": ("counter", "Cache lookups by cache and result (hit/miss)"),
+    "dashboard_bytes_loaded_total": ("counter", "Bytes read from insight files by dataset"),
+    "dashboard_payload_bytes_total": ("counter", "Chart payload bytes sent to the browser by figure, in sampled tab runs"),
+    "dashboard_active_sessions": ("gauge", "Sessions that ran the script within the session timeout"),
+}
+
+_lock = threading.Lock()
+_counters = {}
+_histograms = {}
+_sessions = {}
+_current_trace = contextvars.ContextVar("current_trace", default=None)
+_server = None
+
+
+def _key(metric, labels):
+    return metric, tuple(sorted(labels.items()))
+
+
+def inc(metric, value=1, **labels):
+    with _lock:
+        key = _key(metric, labels)
+        _counters[key] = _counters.get(key, 0) + value
+
+
+def observe(metric, value, **labels):
+    with _lock:
+        key = _key(metric, labels)
+        hist = _histograms.get(key)
+        if hist is None:
+            hist = _histograms[key] = {"buckets": [0] * len(BUCKETS), "sum": 0.0, "count": 0}
+        for i, bound in enumerate(BUCKETS):
+            if value <= bound:
+                hist["buckets"][i] += 1
+        hist["sum"] += value
+        hist["count"] += 1
+
+
+def cache_result(cache, hit):
+    inc("dashboard_cache_requests_total", cache=cache, result="hit" if hit else "miss")
+
+
+def touch_session(session_id):
+    with _lock:
+        _sessions[session_id] = time.monotonic()
+
+
+def active_sessions():
+    cutoff = time.monotonic() - SESSION_TIMEOUT
+    with _lock:
+        for session_id in [s for s, seen in _sessions.items() if seen < cutoff]:
+            del _sessions[session_id]
+        return len(_sessions)
+
+
+@contextmanager
+def span(kind, name, **labels):
+    """Time a block; nested spans inside a sampled tab run are added to its trace"""
+    trace = _current_trace.get()
+    start = time.perf_counter()
+    started_at = time.time()
+    try:
+        yield
+    finally:
+        duration = time.perf_counter() - start
+        observe("dashboard_span_seconds", duration, kind=kind, name=name)
+        if trace is not None:
+            trace["spans"].append({
+                "kind": kind, "name": name, "start": round(started_at, 6),
+                "duration_ms": round(duration * 1000, 3), **labels,
+            })
+
+
+def trace_sampled():
+    """Whether the current tab run is being written to the trace log"""
+    return _current_trace.get() is not None
+
+
+@contextmanager
+def tab_run(tab):
+    """Root span of one script run; samples the run into the trace log"""
+    trace = None
+    if TRACE_SAMPLE_RATE > 0 and random.random() < TRACE_SAMPLE_RATE:
+        trace = {"trace_id": uuid.uuid4().hex, "tab": tab, "start": round(time.time(), 6), "spans": []}
+    token = _current_trace.set(trace)
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        duration = time.perf_counter() - start
+        observe("dashboard_tab_seconds", duration, tab=tab)
+        _current_trace.reset(token)
+        if trace is not None:
+            trace["duration_ms"] = round(duration * 1000, 3)
+            _write_trace(trace)
+
+
+def _write_trace(trace):
+    line = json.dumps(trace, ensure_ascii=False)
+    with _lock:
+        with open(TRACE_LOG, "a", encoding="utf-8") as f:
+            f.write(line + "\n")
+
+
+def read_json(path, **kwargs):
+    """pd.read_json with a load span and byte accounting; unchanged published files come from the snapshot chunk cache"""
+    # Imported here because snapshots itself reports through this module
+    from snapshots import read_frame
+
+    path = Path(path)
+    dataset = f"{path.parent.name}/{path.name}"
+    with span("load", dataset):
+        df = read_frame(path, **kwargs)
+        if df is not None:
+            return df
+        df = pd.read_json(path, **kwargs)
+    inc("dashboard_bytes_loaded_total", path.stat().st_size, dataset=dataset)
+    return df
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(labels):
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in labels) + "}"
+
+
+def render_prometheus():
+    """All metrics in Prometheus text exposition format"""
+    sessions = active_sessions()
+    with _lock:
+        counters = dict(_counters)
+        histograms = {k: {"buckets": list(v["buckets"]), "sum": v["sum"], "count": v["count"]}
+                      for k, v in _histograms.items()}
+
+    lines = []
+    for metric, (metric_type, help_text) in METRIC_HELP.items():
+        lines.append(f"# HELP {metric} {help_text}")
+        lines.append(f"# TYPE {metric} {metric_type}")
+        if metric_type == "gauge":
+            lines.append(f"{metric} {sessions}")
+        elif metric_type == "counter":
+            for (name, labels), value in sorted(counters.items()):
+                if name == metric:
+                    lines.append(f"{metric}{_format_labels(labels)} {value}")
+        else:
+            for (name, labels), hist in sorted(histograms.items()):
+                if name != metric:
+                    continue
+                for bound, count in zip(BUCKETS, hist["buckets"]):
+                    lines.append(f"{metric}_bucket{_format_labels(labels + (('le', bound),))} {count}")
+                lines.append(f"{metric}_bucket{_format_labels(labels + (('le', '+Inf'),))} {hist['count']}")
+                lines.append(f"{metric}_sum{_format_labels(labels)} {hist['sum']}")
+                lines.append(f"{metric}_count{_format_labels(labels)} {hist['count']}")
+    return "\n".join(lines) + "\n"
+
+
+class MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split("?")[0] != "/metrics":
+            self.send_error(404)
+            return
+        body = render_prometheus().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_metrics_server(port=METRICS_PORT, address="127.0.0.1"):
+    """Serve /metrics from a daemon thread; only the first call in a process starts it"""
+    global _server
+    with _lock:
+        if _server is not None or not port:
+            return _server
+        try:
+            _server = ThreadingHTTPServer((address, port), MetricsHandler)
+        except OSError:
+            # Port already taken, e.g. by another dashboard process; don't retry on every rerun
+            _server = False
+            return None
+    threading.Thread(target=_server.serve_forever, name="metrics-server", daemon=True).start()
+    return _server
@@ -0,0 +1,63 @@
+import json
+
+import snapshots
+
+
+def write_table(base_path, table, records):
+    path = base_path / table
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(records), encoding="utf-8")
+
+
+def leaderboard(alice_engagement):
+    # Engagement order, so the author-initial chunk keys repeat: a, b, a, b
+    return [
+        {"userName": "alice", "total_engagement": alice_engagement},
+        {"userName": "bob", "total_engagement": 30},
+        {"userName": "anna", "total_engagement": 20},
+        {"userName": "ben", "total_engagement": 10},
+    ]
+
+
+def test_diff_reports_changes_in_repeated_chunk_keys(tmp_path):
+    base_path, store_dir = tmp_path / "insights", tmp_path / "store"
+    write_table(base_path, "rq4/leaderboard.json", leaderboard(40))
+    old, _ = snapshots.publish(base_path, store_dir)
+    write_table(base_path, "rq4/leaderboard.json", leaderboard(45))
+    new, written = snapshots.publish(base_path, store_dir)
+
+    assert written == 1
+    changes = snapshots.diff(old, new, store_dir)["changed"]["rq4/leaderboard.json"]
+    assert changes["chunks"] == ["author=a"]
+    assert changes["authors"] == ["alice"]
+
+
+def test_diff_reports_months_and_codes(tmp_path):
+    base_path, store_dir = tmp_path / "insights", tmp_path / "store"
+    rows = [{"month": m, "narrative": n, "count": 1} for m in ["2024-01", "2024-02"] for n in ["N-1", "N-2"]]
+    write_table(base_path, "rq2/narrative.json", rows)
+    old, _ = snapshots.publish(base_path, store_dir)
+    rows[3]["count"] = 2
+    write_table(base_path, "rq2/narrative.json", rows)
+    new, _ = snapshots.publish(base_path, store_dir)
+
+    changes = snapshots.diff(old, new, store_dir)["changed"]["rq2/narrative.json"]
+    assert changes["months"] == ["2024-02"]
+    assert changes["codes"] == ["N-2"]
+
+
+def test_checkout_restores_content_and_serves_unchanged_files_from_cache(tmp_path):
+    base_path, store_dir = tmp_path / "insights", tmp_path / "store"
+    path = base_path / "rq4/leaderboard.json"
+    write_table(base_path, "rq4/leaderboard.json", leaderboard(40))
+    old, _ = snapshots.publish(base_path, store_dir)
+    write_table(base_path, "rq4/leaderboard.json", leaderboard(45))
+    snapshots.publish(base_path, store_dir)
+
+    assert snapshots.checkout(old, base_path, store_dir) == (["rq4/leaderboard.json"], [])
+    assert json.loads(path.read_text(encoding="utf-8")) == leaderboard(40)
+    assert snapshots.read_frame(path, store_dir)["total_engagement"].tolist() == [40, 30, 20, 10]
+
+    # A file regenerated in place without publishing is read from disk again
+    write_table(base_path, "rq4/leaderboard.json", leaderboard(100))
+    assert snapshots.read_frame(path, store_dir) is None
@@ -0,0 +1,193 @@
+import argparse
+import json
+from pathlib import Path
+
+import pandas as pd
+
+from author_shards import ENGAGEMENT_COLS, explode_codes, file_digest
+from telemetry import read_json, span
+
+# === Multi-resolution time pyramid for the RQ2/RQ3 trend charts ===
+# Each temporal series is stored at day/week/month/quarter resolution under
+# insights/time_pyramid/<series>/<level>.json with a `period` column holding the
+# start date of each period. Charts pick the finest level whose point count
+# still fits the chart, so long ranges stay light and short ranges keep detail.
+# index.json records a digest of each series' monthly source file; when that
+# file is regenerated in place, the series is rolled up from it again until
+# the pyramid is rebuilt.
+
+BASE_PATH = Path("insights")
+PYRAMID_DIR = "time_pyramid"
+INDEX_FILE = "index.json"
+
+LEVELS = ["day", "week", "month", "quarter"]
+LEVEL_FREQ = {"day": "D", "week": "W", "month": "M", "quarter": "Q"}
+
+# Nominal chart width in pixels and minimum horizontal spacing between markers.
+# Streamlit does not report the browser width, so the budget is based on a wide layout.
+CHART_WIDTH_PX = 1200
+MIN_PX_PER_POINT = 8
+
+# series -> (monthly source file, group keys, code column, value columns)
+SERIES = {
+    "narrative": (("rq2", "narrative_over_time.json"), [], "narrative", ["count"]),
+    "narrative_by_actor_type": (("rq2", "narrative_over_time_by_actor_type.json"), ["actor_type"], "narrative", ["count"]),
+    "narrative_by_us_admin": (("rq2", "narrative_over_time_by_us_admin.json"), ["administration"], "narrative", ["count"]),
+    "theme_by_actor": (("rq2_themes_framing", "theme_monthly_by_actor.json"), ["actor_type"], "code", ["count"]),
+    "framing_by_actor": (("rq2_themes_framing", "framing_monthly_by_actor.json"), ["actor_type"], "code", ["count"]),
+    "engagement": (("rq3", "narrative_engagement_over_time.json"), [], "narrative", ["total_engagement"]),
+}
+
+
+def _add_percent(df, keys):
+    if "count" in df.columns:
+        totals = df.groupby(["period"] + keys)["count"].transform("sum")
+        df["percent"] = (df["count"] / totals * 100).round(2)
+    return df
+
+
+def roll_up(df, level, keys, code_col, value_cols):
+    """Aggregate a series with a `period` column to the given level"""
+    df = df.copy()
+    df["period"] = pd.to_datetime(df["period"]).dt.to_period(LEVEL_FREQ[level]).dt.start_time
+    df = df.groupby(["period"] + keys + [code_col], as_index=False)[value_cols].sum()
+    df = _add_percent(df, keys)
+    df["period"] = df["period"].dt.strftime("%Y-%m-%d")
+    return df.sort_values(["period"] + keys + [code_col]).reset_index(drop=True)
+
+
+def _source_path(base_path, series):
+    folder, filename = SERIES[series][0]
+    return Path(base_path) / folder / filename
+
+
+def _monthly_source(base_path, series):
+    (folder, filename), keys, code_col, value_cols = SERIES[series]
+    df = read_json(Path(base_path) / folder / filename, dtype={"created_month": str, "month": str})
+    month_col = "created_month" if "created_month" in df.columns else "month"
+    df = df.rename(columns={month_col: "period"})
+    return df[["period"] + keys + [code_col] + value_cols]
+
+
+def _tweet_source(df_tweets, series):
+    _, keys, code_col, value_cols = SERIES[series]
+    df = df_tweets.copy()
+    df["period"] = pd.to_datetime(df["createdAt"]).dt.floor("D")
+    if "total_engagement" not in df.columns:
+        df["total_engagement"] = df[[c for c in ENGAGEMENT_COLS if c in df.columns]].sum(axis=1)
+
+    if series == "theme_by_actor":
+        df = explode_codes(df, "themes").rename(columns={"themes": "code"})
+    elif series == "framing_by_actor":
+        df = explode_codes(df, "framing").rename(columns={"framing": "code"})
+    if series == "narrative_by_us_admin":
+        df = df[df["actor_type"] == "US_Admin"].explode("administration")
+
+    if value_cols == ["count"]:
+        df["count"] = 1
+    else:
+        value_cols = [c for c in ENGAGEMENT_COLS if c in df.columns]
+    return df[["period"] + keys + [code_col] + value_cols]
+
+
+def build_time_pyramid(base_path=BASE_PATH, tweets=None):
+    """Write every series at each level. Without coded tweets only month and quarter can be derived."""
+    base_path = Path(base_path)
+    levels = LEVELS if tweets is not None else ["month", "quarter"]
+    written = {}
+    index = {}
+    for series, (_, keys, code_col, _) in SERIES.items():
+        df = _tweet_source(tweets, series) if tweets is not None else _monthly_source(base_path, series)
+        value_cols = [c for c in df.columns if c not in ["period"] + keys + [code_col]]
+        out_dir = base_path / PYRAMID_DIR / series
+        out_dir.mkdir(parents=True, exist_ok=True)
+        for old in out_dir.glob("*.json"):
+            if old.stem not in levels:
+                old.unlink()
+        for level in levels:
+            roll_up(df, level, keys, code_col, value_cols).to_json(
+                out_dir / f"{level}.json", orient="records", indent=2, force_ascii=False
+            )
+        written[series] = levels
+        index[series] = {"levels": levels, "source_digest": file_digest(_source_path(base_path, series))}
+    with open(base_path / PYRAMID_DIR / INDEX_FILE, "w", encoding="utf-8") as f:
+        json.dump(index, f, indent=1)
+    return written
+
+
+def pyramid_current(series, base_path=BASE_PATH):
+    """Whether the stored levels of a series were built from its current monthly source file"""
+    index_path = Path(base_path) / PYRAMID_DIR / INDEX_FILE
+    try:
+        with open(index_path, "r", encoding="utf-8") as f:
+            entry = json.load(f).get(series)
+        return entry is not None and entry["source_digest"] == file_digest(_source_path(base_path, series))
+    except OSError:
+        return False
+
+
+def available_levels(series, base_path=BASE_PATH):
+    if not pyramid_current(series, base_path):
+        # Missing or stale pyramid: only the levels derivable from the monthly source
+        return ["month", "quarter"]
+    series_dir = Path(base_path) / PYRAMID_DIR / series
+    levels = [level for level in LEVELS if (series_dir / f"{level}.json").exists()]
+    return levels or ["month", "quarter"]
+
+
+def pick_level(levels, start, end, facet_cols=1):
+    """Pick the finest available level whose number of periods in [start, end] fits the chart width"""
+    max_points = max(CHART_WIDTH_PX // facet_cols // MIN_PX_PER_POINT, 1)
+    for level in levels:
+        n_points = len(pd.period_range(pd.Timestamp(start), pd.Timestamp(end), freq=LEVEL_FREQ[level]))
+        if n_points <= max_points:
+            return level
+    return levels[-1]
+
+
+def load_series(series, level, start=None, end=None, base_path=BASE_PATH):
+    path = Path(base_path) / PYRAMID_DIR / series / f"{level}.json"
+    if path.exists() and pyramid_current(series, base_path):
+        df = read_json(path, dtype={"period": str})
+    else:
+        # No pyramid built yet, or its source changed since: roll the monthly insight file up directly
+        _, keys, code_col, value_cols = SERIES[series]
+        df = roll_up(_monthly_source(base_path, series), level, keys, code_col, value_cols)
+
+    with span("transform", f"pyramid:{series}:{level}"):
+        period = pd.to_datetime(df["period"])
+        if start is not None:
+            df = df[period >= pd.Timestamp(start).to_period(LEVEL_FREQ[level]).start_time]
+        if end is not None:
+            df = df[period <= pd.Timestamp(end)]
+        return df.reset_index(drop=True)
+
+
+def series_date_range(series, base_path=BASE_PATH):
+    levels = available_levels(series, base_path)
+    df = load_series(series, levels[0], base_path=base_path)
+    period = pd.to_datetime(df["period"])
+    end = period.max().to_period(LEVEL_FREQ[levels[0]]).end_time
+    return period.min().date(), end.date()
+
+
+def load_trend(series, date_range, resolution="Auto", facet_cols=1, base_path=BASE_PATH):
+    """Load a series for the selected date range at the requested or automatically picked level"""
+    start, end = date_range
+    levels = available_levels(series, base_path)
+    if resolution == "Auto" or resolution.lower() not in levels:
+        level = pick_level(levels, start, end, facet_cols)
+    else:
+        level = resolution.lower()
+    return load_series(series, level, start, end, base_path), level
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build the day/week/month/quarter time pyramid.")
+    parser.add_argument("--insights", default=str(BASE_PATH), help="Insights directory")
+    parser.add_argument("--tweets", help="Optional coded tweets JSON; required for day and week levels")
+    args = parser.parse_args()
+
+    tweets = pd.read_json(args.tweets) if args.tweets else None
+    for series, levels in build_time_pyramid(args.insights, tweets).items():
+        print(f"{series}: {', '.join(levels)}")